@@ -1,5 +1,87 @@
 """This module contains the BaseExtension and BaseProvider class."""
 import abc
+import functools
+import operator
+
+
+def memoize(quantize=None, maxsize=64, attributes=()):
+    """Decorator to memoize a formatting method of an extension.
+
+    Each positional argument is quantized with `quantize` before it is passed
+    to the method, so the formatted string only depends on the quantized
+    arguments and is reused as long as they do not change. Results are
+    cached per extension instance, and the cache of an instance is cleared
+    once it holds `maxsize` results. If the result also depends on the
+    configuration of the extension, the attributes holding it should be
+    listed in `attributes`, so results are not reused once they change.
+
+    Parameters
+    ----------
+    quantize : callable, optional
+        Called with each argument to get its quantized value, e.g. `int` for
+        whole seconds or integer percent, or `significant_digits(3)`. If
+        None, arguments are used as they are (Default None).
+
+    maxsize : int, optional
+        Maximum number of results cached per extension instance
+        (Default 64).
+
+    attributes : sequence of str, optional
+        Names of the instance attributes the result depends on (Default ()).
+
+    Examples
+    --------
+    >>> class Seconds(BaseExtension):
+    ...     @memoize(int)
+    ...     def _format(self, seconds):
+    ...         return "{}s".format(seconds)
+    """
+    get_config = operator.attrgetter(*attributes) if attributes else None
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            if quantize is not None:
+                if len(args) == 1:
+                    args = (quantize(args[0]),)
+                else:
+                    args = tuple([quantize(i) for i in args])
+            if get_config is None:
+                key = (func, args)
+            else:
+                key = (func, args, get_config(self))
+            memo = self._memo
+            try:
+                return memo[key]
+            except KeyError:
+                pass
+            if len(memo) >= maxsize:
+                memo.clear()
+            value = memo[key] = func(self, *args)
+            return value
+        return wrapper
+    return decorator
+
+
+def significant_digits(digits):
+    """Create a quantizer which rounds numbers to `digits` significant
+    digits, for use with `memoize`.
+
+    Parameters
+    ----------
+    digits : int
+        Number of significant digits kept.
+
+    Returns
+    -------
+    callable:
+        Function mapping a number to its rounded value.
+    """
+    spec = '.{}g'.format(digits)
+
+    def quantize(x):
+        return float(format(x, spec))
+    return quantize
 
 
 class BaseExtension(object):
@@ -23,12 +105,17 @@ class BaseExtension(object):
     All extensions need to explicitly call __init__ of the BaseExtension with
     appropriate requirements. If an extension inherits from another extension,
     __init__ should be called like BaseExtension.__init__(self, requirements)
+
+    Formatting methods which are called on every update can be decorated
+    with `memoize` to reuse their output while their quantized inputs do not
+    change.
     """
     @abc.abstractmethod
     def __init__(self, requirements, update_interval=None):
         self._value = None
         self._requirements = requirements
         self._update_interval = update_interval
+        self._memo = {}
 
     def get_requirements(self):
         """Get the requirements of the extension.
@@ -178,8 +265,12 @@ class BaseProvider(object):
 
     Parameters
     ----------
-    tag : str
-        A string which is not already a registered tag
+    tag : str or tuple of str
+        A string which is not already a registered tag. A provider which
+        computes several related stats in one pass can provide a tuple of
+        such tags instead, in which case its value is a tuple holding the
+        value of each tag in the same order, or None if all of them are
+        invalid.
 
     requirements : array_like
         iterable of strings where each string should be a built-in tag or a tag
@@ -195,7 +286,12 @@ class BaseProvider(object):
     def __init__(self, tag, requirements):
         self._value = None
         self._requirements = requirements
-        self._tag = tag
+        if isinstance(tag, tuple):
+            self._tag = tag[0]
+            self._tags = tag
+        else:
+            self._tag = tag
+            self._tags = (tag,)
 
     def get_requirements(self):
         """Get the requirements of the extension.
@@ -208,7 +304,8 @@ class BaseProvider(object):
         return self._requirements
 
     def get_tag(self):
-        """Return the `tag` of the Provider.
+        """Return the `tag` of the Provider, or its first tag if it provides
+        several.
 
         Returns
         -------
@@ -217,6 +314,17 @@ class BaseProvider(object):
         """
         return self._tag
 
+    def get_tags(self):
+        """Return all tags of the Provider.
+
+        Returns
+        -------
+        tuple of str:
+            Tags of the provider, which is a single tag unless it provides
+            several.
+        """
+        return self._tags
+
     def set_value(self, value):
         """This method sets the value of the tag provided by the provider.
 
@@ -267,6 +375,27 @@ class BaseProvider(object):
         else:
             self.on_invalidated(params)
 
+    def on_publish(self, time_, value, worker=None):
+        """Override this method to observe every call to publish.
+
+        Unlike `on_update`, this method is called on each publish even if the
+        Progress Indicator is not due for an update, so it should be cheap.
+        It is only called for providers which override it.
+
+        Parameters
+        ----------
+        time_ : float
+            Time at which publish was called.
+
+        value : float or None
+            Value passed to publish.
+
+        worker : hashable or None
+            Worker passed to publish. Overrides may leave this parameter
+            out, as providers written before it was added do.
+        """
+        pass
+
     def on_end(self, params):
         """Override this method to calculate the final value for the provider.
 
@@ -0,0 +1,82 @@
+"""This module contains utilities to show progress while processing large
+buffers in chunks."""
+from __future__ import division
+
+
+def _get_nbytes(view):
+    # memoryview has no nbytes on Python 2.
+    nbytes = view.itemsize
+    for dimension in view.shape:
+        nbytes *= dimension
+    return nbytes
+
+
+def iter_chunks(indicator, buffer, chunk_size, unit='items'):
+    """Iterate over `buffer` in chunks while displaying progress.
+
+    Chunks are views into `buffer`, so no data is copied. NumPy arrays (or
+    any object exposing ``__array_interface__``) are sliced directly and
+    yield arrays. Any other object supporting the buffer protocol, such as
+    `bytearray`, `bytes` or `mmap.mmap`, yields `memoryview` slices.
+
+    The range of `indicator` is set from the size of `buffer`. It is begun
+    before the first chunk is yielded, advanced after each chunk has been
+    processed and ended once all chunks have been processed.
+
+    Parameters
+    ----------
+    indicator : ProgressIndicator
+        The indicator used to display progress.
+
+    buffer : object
+        The buffer to iterate over. Chunks are taken along its first
+        dimension.
+
+    chunk_size : int
+        Number of elements along the first dimension in each chunk.
+
+    unit : {'items', 'bytes'}, optional
+        Whether progress is counted in elements along the first dimension
+        or in bytes (Default 'items').
+
+    Yields
+    ------
+    memoryview or array
+        Consecutive views of at most `chunk_size` elements.
+    """
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be a positive integer")
+    if unit not in ('items', 'bytes'):
+        raise ValueError("'unit' must be 'items' or 'bytes', not {!r}".format(unit))
+
+    if hasattr(buffer, '__array_interface__'):
+        view = buffer
+    else:
+        view = memoryview(buffer)
+    try:
+        length = len(view)
+        if unit == 'bytes':
+            nbytes = _get_nbytes(view)
+            step = nbytes // length if length else 0
+            total = nbytes
+        else:
+            step = 1
+            total = length
+
+        indicator.min_value = 0
+        indicator.max_value = total
+        indicator.begin()
+        publish = indicator.publish
+        for start in range(0, length, chunk_size):
+            stop = min(start + chunk_size, length)
+            yield view[start:stop]
+            publish(stop * step)
+        indicator.end()
+    finally:
+        if isinstance(view, memoryview) and hasattr(view, 'release'):
+            # Allows the underlying buffer, e.g. an mmap, to be closed. This
+            # fails if a chunk is still referenced by the caller.
+            try:
+                view.release()
+            except BufferError:
+                pass
@@ -0,0 +1,208 @@
+"""This module contains the command-line interface, which copies its standard
+input to its standard output and displays the progress on standard error,
+e.g. in a shell pipeline::
+
+    tar c data | python -m progressindicator | gzip > data.tar.gz
+    python -m progressindicator < data.img > /dev/sdb
+
+The data is copied without entering user space where the system allows it,
+with ``splice`` when either end is a pipe, else with ``sendfile`` when the
+input is a regular file. Otherwise it is read into a single reusable
+buffer, so the copy is rarely slower than the processes on either side.
+"""
+from __future__ import division
+import argparse
+import errno
+import io
+import os
+import stat
+import sys
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows.
+    fcntl = None
+from .core import ProgressIndicator
+from .extensions import Percentage, Bar, ETA, Timer, Size, Throughput
+
+# fcntl command to resize a pipe, defined on Linux only.
+_F_SETPIPE_SZ = 1031
+
+# Errors raised by splice and sendfile for unsupported files.
+_FALLBACK_ERRNOS = frozenset([errno.EINVAL, errno.ENOSYS, errno.EBADF,
+                              getattr(errno, 'ENOTSUP', errno.EINVAL),
+                              getattr(errno, 'EOPNOTSUPP', errno.EINVAL)])
+
+_SIZE_SUFFIXES = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def _parse_size(text):
+    """Parse a number of bytes with an optional binary suffix, e.g. 1.5G."""
+    number = text.upper().rstrip('IB')
+    suffix = number[-1:] if number[-1:] in _SIZE_SUFFIXES else ''
+    try:
+        return int(float(number[:len(number) - len(suffix)]) * _SIZE_SUFFIXES[suffix])
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size: {!r}".format(text))
+
+
+def _get_input_size(fd):
+    # Only the size of regular files is known in advance.
+    try:
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            return os.fstat(fd).st_size - os.lseek(fd, 0, os.SEEK_CUR)
+    except OSError:
+        pass
+    return None
+
+
+def _grow_pipe(fd, size):
+    # Larger pipes let splice move more bytes per call.
+    if fcntl is None:
+        return
+    try:
+        if stat.S_ISFIFO(os.fstat(fd).st_mode):
+            fcntl.fcntl(fd, _F_SETPIPE_SZ, size)
+    except (IOError, OSError):
+        pass
+
+
+def _copy_in_kernel(copy):
+    # Yields the bytes copied by each call to copy, or nothing if the files
+    # are not supported. The first call copies nothing if it fails, so the
+    # copy can go on with another method.
+    try:
+        count = copy()
+    except OSError as exc:
+        if exc.errno not in _FALLBACK_ERRNOS:
+            raise
+        return
+    while count:
+        yield count
+        count = copy()
+    yield 0
+
+
+def iter_copy(in_fd, out_fd, buffer_size=1 << 20):
+    """Copy all data from `in_fd` to `out_fd` with the fastest available
+    method.
+
+    Parameters
+    ----------
+    in_fd : int
+        File descriptor to read from.
+
+    out_fd : int
+        File descriptor to write to.
+
+    buffer_size : int, optional
+        Maximum number of bytes copied at once (Default 1 MiB).
+
+    Yields
+    ------
+    int
+        Number of bytes copied by each step, 0 once the input is exhausted.
+    """
+    in_mode = os.fstat(in_fd).st_mode
+    out_mode = os.fstat(out_fd).st_mode
+    if hasattr(os, 'splice') and (stat.S_ISFIFO(in_mode) or stat.S_ISFIFO(out_mode)):
+        _grow_pipe(in_fd, buffer_size)
+        _grow_pipe(out_fd, buffer_size)
+        copied = False
+        for count in _copy_in_kernel(lambda: os.splice(in_fd, out_fd, buffer_size)):
+            copied = True
+            yield count
+        if copied:
+            return
+    if hasattr(os, 'sendfile') and stat.S_ISREG(in_mode):
+        copied = False
+        for count in _copy_in_kernel(lambda: os.sendfile(out_fd, in_fd, None, buffer_size)):
+            copied = True
+            yield count
+        if copied:
+            return
+    buffer_ = bytearray(buffer_size)
+    view = memoryview(buffer_)
+    reader = io.open(in_fd, 'rb', buffering=0, closefd=False)
+    while True:
+        count = reader.readinto(buffer_)
+        if not count:
+            break
+        written = 0
+        while written < count:
+            written += os.write(out_fd, view[written:count])
+        yield count
+    yield 0
+
+
+def _get_indicator(size, interval):
+    if size is None:
+        components = [Size(), Throughput(), Timer()]
+    else:
+        components = [Percentage(), Bar(length=40), Size(), Throughput(),
+                      "ETA:", ETA()]
+    indicator = ProgressIndicator(components=components, min_value=0,
+                                  max_value=float('inf') if size is None else size,
+                                  max_update_interval=interval)
+    indicator.clear_on_task_completion = False
+    return indicator
+
+
+def main(argv=None):
+    """Run the command-line interface.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Arguments, without the program name (Default sys.argv[1:]).
+
+    Returns
+    -------
+    int:
+        Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog='progressindicator',
+        description="Copy standard input to standard output and display the "
+                    "progress on standard error.")
+    parser.add_argument('-s', '--size', type=_parse_size,
+                        help="expected number of bytes, e.g. 1.5G. Default "
+                             "is the size of the input if it is a file")
+    parser.add_argument('-B', '--buffer-size', type=_parse_size, default=1 << 20,
+                        help="maximum number of bytes copied at once "
+                             "(default 1M)")
+    parser.add_argument('-i', '--interval', type=float, default=0.5,
+                        help="maximum time in seconds between two updates "
+                             "(default 0.5)")
+    args = parser.parse_args(argv)
+
+    in_fd, out_fd = sys.stdin.fileno(), sys.stdout.fileno()
+    sys.stdout.flush()
+    size = args.size if args.size is not None else _get_input_size(in_fd)
+    indicator = _get_indicator(size, args.interval)
+    indicator.begin()
+    copied = 0
+    try:
+        for count in iter_copy(in_fd, out_fd, args.buffer_size):
+            copied += count
+            if copied > indicator.max_value:
+                indicator.set_max_value(copied)
+            indicator.publish(copied)
+    except KeyboardInterrupt:
+        status = 130
+    except (IOError, OSError) as exc:
+        if exc.errno != errno.EPIPE:
+            raise
+        # The reading process has exited.
+        status = 1
+    else:
+        status = 0
+    if status == 0:
+        # The input may be shorter than the expected size.
+        indicator.set_max_value(copied)
+        indicator.end()
+    else:
+        indicator.refresh()
+        indicator.reset()
+    sys.stderr.write('\n')
+    return status
@@ -1,10 +1,125 @@
 from __future__ import print_function
 from __future__ import division
+import threading
 import time
 import sys
+try:
+    from collections.abc import Iterable
+except ImportError:
+    # Python 2
+    from collections import Iterable
+try:
+    from types import MappingProxyType
+except ImportError:
+    # Python 2 has no read-only mapping type.
+    MappingProxyType = dict
+try:
+    _text_type = unicode
+except NameError:
+    # Python 3
+    _text_type = str
+_string_types = (str, _text_type)
 from .base import BaseExtension, BaseProvider
+from .terminal import get_width
 from .tags import *
-from .providers import RateProvider, ETAProvider, ETA1Provider
+from .providers import (RateETAProvider, LatencyProvider, TrendProvider,
+                        WorkerProvider, ThroughputProvider)
+
+# Flag of code objects taking *args.
+_CO_VARARGS = 0x04
+
+
+def _get_publish_hook(provider):
+    # Overrides of on_publish written before the `worker` parameter was
+    # added take two parameters, they are called without it.
+    method = provider.on_publish
+    code = getattr(getattr(method, '__func__', method), '__code__', None)
+    if code is None or code.co_flags & _CO_VARARGS or code.co_argcount >= 4:
+        return method
+    return lambda time_, value, worker: method(time_, value)
+
+
+# Tags whose value is a mutable object updated in place, which are left out
+# of snapshots. Their summaries, e.g. `latency_p50`, are plain values.
+_MUTABLE_TAGS = (TAG_LATENCY, TAG_HISTORY)
+
+
+def _make_snapshot(stats):
+    snapshot = dict(stats)
+    for tag in _MUTABLE_TAGS:
+        snapshot.pop(tag, None)
+    return MappingProxyType(snapshot)
+
+
+def _overrides_on_publish(provider):
+    method = type(provider).on_publish
+    # Python 2 returns a new unbound method on each attribute access.
+    return (getattr(method, '__func__', method)
+            is not getattr(BaseProvider.on_publish, '__func__', BaseProvider.on_publish))
+
+
+# Providers registered with every ProgressIndicator. They are only
+# instantiated once an extension requires one of their tags, and a single
+# instance provides all of them.
+_DEFAULT_PROVIDERS = (
+    (TAG_RATE, RateETAProvider),
+    (TAG_ETA, RateETAProvider),
+    (TAG_ETA1, RateETAProvider),
+)
+
+# Other built-in providers, only registered once one of their tags is
+# required and no provider is registered for it, so custom providers can
+# still be registered for these tags.
+_BUILTIN_PROVIDERS = {
+    TAG_LATENCY: LatencyProvider,
+    TAG_LATENCY_P50: LatencyProvider,
+    TAG_LATENCY_P95: LatencyProvider,
+    TAG_LATENCY_P99: LatencyProvider,
+    TAG_TREND: TrendProvider,
+    TAG_ETA_TREND: TrendProvider,
+    TAG_ETA_TREND_LOW: TrendProvider,
+    TAG_ETA_TREND_HIGH: TrendProvider,
+    TAG_WORKER_RATE: WorkerProvider,
+    TAG_WORKER_IDLE: WorkerProvider,
+    TAG_THROUGHPUT: ThroughputProvider,
+}
+
+_DEFAULT_PROVIDERS_KEY = frozenset(_DEFAULT_PROVIDERS)
+
+# Indicators whose task is underway, see live_indicators. The set is
+# created by the first indicator which begins.
+_live_indicators = None
+
+# Scheduler drawing the indicators which begin without a display, see
+# scheduler.set_default_scheduler.
+_default_scheduler = None
+
+
+def _get_live_indicators():
+    global _live_indicators
+    if _live_indicators is None:
+        import weakref
+        _live_indicators = weakref.WeakSet()
+    return _live_indicators
+
+
+def live_indicators():
+    """Get all indicators of the process whose task is underway, i.e. which
+    have begun and not ended yet.
+
+    Returns
+    -------
+    list:
+        The live `ProgressIndicator` instances.
+    """
+    if _live_indicators is None:
+        return []
+    while True:
+        try:
+            return list(_live_indicators)
+        except RuntimeError:
+            # Another thread began or ended an indicator meanwhile.
+            pass
 
 
 class ProgressIndicator:
@@ -25,6 +140,10 @@ class ProgressIndicator:
         Maximum time interval between two updates of the Progress Indicator.
         Default is 0.50s.
 
+    update_policy : UpdatePolicy, optional
+        Decides when the Progress Bar is updated on publish. See
+        :mod:`~.policies`. Default is `default_policy()`.
+
     Attributes
     ----------
     clear_on_task_completion : bool
@@ -34,22 +153,59 @@ class ProgressIndicator:
         Minimum value of the progress.
 
     max_value : int, float
-        Maximum value of the progress
+        Maximum value of the progress. Use `set_max_value` to change it
+        while a task is underway.
 
     max_update_interval : float
         Maximum interval in seconds between succesive updates
 
+    update_policy : UpdatePolicy
+        Decides when the Progress Bar is updated on publish.
+
     seperator : str
         String used to join output of components.(Default ' ')
 
     components : list
         List of components used to build the progress bar.
+
+    clock : callable
+        Function returning the current time in seconds. Default is
+        `time.time`. Replace it to drive the indicator from a virtual clock.
+
+    recorder : Recorder or None
+        If set, every call to `begin`, `publish`, `set_max_value` and `end`
+        is logged to it.
+        See :mod:`~.recording`.
+
+    history : History or None
+        If set, every published value is added to it and it is provided as
+        the `history` tag. See :mod:`~.history`.
+
+    display : object or None
+        If set, the Progress Bar is not printed to `stream`. Instead, the
+        display's ``on_frame(indicator)`` method is called whenever a new
+        frame is available through `get_last_frame`, or it is cleared, and
+        text passed to
+        `write` is handed to its ``write_above(text)`` method. This is used
+        to draw several indicators together, see :mod:`~.remote`.
+
+    Notes
+    -----
+    The order in which providers are executed is resolved on the first call
+    to `begin` and shared by all indicators with identical components and
+    providers, so creating many short-lived indicators is cheap. Use `reset`
+    to reuse an indicator for a new task.
     """
 
+    # Maps a configuration of components and providers to the tags of the
+    # providers to load in execution order and the update interval.
+    _plans = {}
+    _max_plans = 256
+
     def __init__(self, components, min_value=0, max_value=100,
-                 stream=sys.stderr, max_update_interval=0.5):
-        import collections
-        if not isinstance(components, collections.Iterable):
+                 stream=sys.stderr, max_update_interval=0.5,
+                 update_policy=None):
+        if not isinstance(components, Iterable):
             raise TypeError("'components' must be iterable")
         self._is_allowed_to_print = True
         self._is_allowed_to_publish = False
@@ -57,41 +213,76 @@ class ProgressIndicator:
         if min_value > max_value:
             raise ValueError("min_value should be less than max_value")
         self._printed_char_num = 0
-        self._registered_providers = dict()
+        self._registered_providers = dict(_DEFAULT_PROVIDERS)
+        self._providers_key = _DEFAULT_PROVIDERS_KEY
         self._loaded_providers = dict()
         self._iterator = None
-        self._range = max_value - min_value
+        self._iterated_count = 0
+        self._prefix_sums = None
+        self._weight = None
+        self._iterated_weight = 0
+        self._published_value = None
+        self._last_frame = None
+        self._last_frame_width = 0
+        self._snapshot = MappingProxyType({})
         self._ordered_providers_tags = []
+        self._extensions = []
+        self._publish_hooks = []
         self._update_interval = max_update_interval
+        self._is_update_due = None
+        self._headless_update_at = 1
+        self._headless_iterations = 0
+        self._is_counting_only = False
+        self._are_extensions_begun = False
+        # Held while extensions, the last frame or the stream are updated,
+        # which a Watchdog also does from its own thread. It is reentrant,
+        # as e.g. an extension may log through a ProgressLogHandler.
+        self._frame_lock = threading.RLock()
 
         self.seperator = ' '
         self.min_value = min_value
         self.max_value = max_value
         self.stream = stream
         self.max_update_interval = max_update_interval
+        if update_policy is None:
+            from .policies import default_policy
+            update_policy = default_policy()
+        self.update_policy = update_policy
         self.clear_on_task_completion = True
         self.components = components
-
-        self._register_default_providers()
-
-    def _register_default_providers(self):
-        self.register_provider(RateProvider())
-        self.register_provider(ETAProvider())
-        self.register_provider(ETA1Provider())
+        self.clock = time.time
+        self.recorder = None
+        self.history = None
+        self.display = None
+        self._scheduler = None
 
     def _fire_event(self, event):
-        for tag in self._ordered_providers_tags:
+        self._fire_providers_event(event)
+        if self._is_allowed_to_print:
+            self._fire_extensions_event(event)
+
+    def _fire_providers_event(self, event):
+        stats = self._stats
+        for tag, outputs in self._ordered_providers_tags:
             provider = self._loaded_providers[tag]
             required_tags = provider.get_requirements()
-            params = [self._stats[i] for i in required_tags]
+            params = [stats[i] for i in required_tags]
             getattr(provider, event)(params)
-            self._stats[tag] = provider.get_value()
+            value = provider.get_value()
+            if outputs is None:
+                stats[tag] = value
+            elif value is None:
+                for output, _ in outputs:
+                    stats[output] = None
+            else:
+                for output, index in outputs:
+                    stats[output] = value[index]
 
-        for component in self.components:
-            if isinstance(component, BaseExtension):
-                requirements = component.get_requirements()
-                params = [self._stats[i] for i in requirements]
-                getattr(component, event)(params)
+    def _fire_extensions_event(self, event):
+        for extension in self._extensions:
+            requirements = extension.get_requirements()
+            params = [self._stats[i] for i in requirements]
+            getattr(extension, event)(params)
 
     def begin(self):
         """Performs initial tasks prior to printing progress bar.
@@ -101,27 +292,45 @@ class ProgressIndicator:
         initializing Progress Bar. If not called, first call to publish() will
         automatically call this method.
         """
-        component_update_intervals = []
-        for component in self.components:
-            if isinstance(component, BaseExtension):
-                requirements = component.get_requirements()
-                update_interval = component._get_update_interval()
-                if update_interval is not None:
-                    component_update_intervals.append(update_interval)
-                else:
-                    component_update_intervals.append(self.max_update_interval)
-                for requirement in requirements:
-                    self._load_provider(requirement)
-
+        scheduler = _default_scheduler
+        if (scheduler is not None and self.display is None
+                and self._scheduler is None):
+            scheduler.register(self)
+            self._scheduler = scheduler
+        extensions = [component for component in self.components
+                      if isinstance(component, BaseExtension)]
+        key = (tuple((tuple(extension.get_requirements()),
+                      extension._get_update_interval())
+                     for extension in extensions),
+               self.max_update_interval,
+               self._get_providers_key())
         try:
-            self._update_interval = min(min(component_update_intervals), self.max_update_interval)
-        except TypeError:
-            self._update_interval = self.max_update_interval
+            ordered_providers_tags, self._update_interval = self._plans[key]
+        except KeyError:
+            ordered_providers_tags, self._update_interval = self._make_plan(extensions)
+            if len(self._plans) >= self._max_plans:
+                self._plans.clear()
+            self._plans[key] = (ordered_providers_tags, self._update_interval)
+
+        self._extensions = extensions
+        self._ordered_providers_tags = ordered_providers_tags
+        self._loaded_providers = {}
+        for tag, outputs in ordered_providers_tags:
+            self._loaded_providers[tag] = self._get_provider(tag)
+            if outputs is None:
+                self._stats[tag] = None
+            else:
+                for output, _ in outputs:
+                    self._stats[output] = None
 
         self._stats[TAG_VALUE] = None
+        self._published_value = None
         self._stats[TAG_MAX_VALUE] = self.max_value
         self._stats[TAG_MIN_VALUE] = self.min_value
-        self._stats[TAG_BEGIN_TIME] = time.time()
+        time_curr = self.clock()
+        if self.recorder is not None:
+            self.recorder.on_begin(time_curr, self.min_value, self.max_value)
+        self._stats[TAG_BEGIN_TIME] = time_curr
         self._stats[TAG_END_TIME] = None
         self._stats[TAG_ITERATIONS] = 0
         self._stats[TAG_PERCENTAGE] = 0
@@ -129,12 +338,25 @@ class ProgressIndicator:
         self._stats[TAG_DELTATIME] = 0
         self._stats[TAG_LAST_UPDATED_AT] = None
         self._stats[TAG_TIME_SINCE_UPDATE] = None
-
-        self._range = self.max_value - self.min_value
-        self._ordered_providers_tags = self._topological_sort(self._loaded_providers.copy())
-        self._fire_event('on_begin')
-        self._update_progress_bar()
-        self._is_allowed_to_publish = True
+        self._stats[TAG_STALLED] = None
+        if self.history is not None:
+            self.history.on_begin(time_curr, self.min_value)
+        self._stats[TAG_HISTORY] = self.history
+        self._headless_update_at = 1
+        self._headless_iterations = 0
+
+        self._publish_hooks = [_get_publish_hook(provider)
+                               for provider in self._loaded_providers.values()
+                               if _overrides_on_publish(provider)]
+        self._update_publish_mode()
+        self.update_policy.on_begin(self)
+        self._is_update_due = self.update_policy.is_due
+        with self._frame_lock:
+            self._fire_event('on_begin')
+            self._are_extensions_begun = self._is_allowed_to_print
+            self._update_progress_bar()
+            self._is_allowed_to_publish = True
+        _get_live_indicators().add(self)
 
     def end(self):
         """Performs clean up tasks after printing Progress Bar.
@@ -146,44 +368,183 @@ class ProgressIndicator:
         clear_on_task_completion is True. The console should support
         printing carriage returns.
         """
+        time_curr = self.clock()
+        if self.recorder is not None:
+            self.recorder.on_end(time_curr)
+        if self.history is not None:
+            self.history.on_end(time_curr, self.max_value)
         self._stats[TAG_VALUE] = self.max_value
         self._stats[TAG_MAX_VALUE] = self.max_value
         self._stats[TAG_MIN_VALUE] = self.min_value
-        self._stats[TAG_END_TIME] = time.time()
+        self._stats[TAG_END_TIME] = time_curr
         self._stats[TAG_PERCENTAGE] = 100
-        self._stats[TAG_TIME_SINCE_BEGIN] = time.time() - self._stats[TAG_BEGIN_TIME]
-
-        self._fire_event('on_end')
-        self._update_progress_bar()
+        self._stats[TAG_TIME_SINCE_BEGIN] = time_curr - self._stats[TAG_BEGIN_TIME]
+
+        with self._frame_lock:
+            self._fire_event('on_end')
+            self._update_progress_bar()
+            self._loaded_providers = {}
+            self._publish_hooks = []
+            if self.clear_on_task_completion:
+                self._clear_progress_bar()
+            self._is_allowed_to_publish = False
+        scheduler = self._scheduler
+        if scheduler is not None:
+            # The final frame leaves the block drawn by the default scheduler.
+            frame = self.get_last_frame()
+            self._scheduler = None
+            scheduler.unregister(self)
+            scheduler.write_above('' if frame is None else frame + '\n')
+        if _live_indicators is not None:
+            _live_indicators.discard(self)
+
+    def _make_plan(self, extensions):
         self._loaded_providers = {}
-        if self.clear_on_task_completion:
-            self._clear_progress_bar()
-        self._is_allowed_to_publish = False
+        component_update_intervals = []
+        for extension in extensions:
+            update_interval = extension._get_update_interval()
+            if update_interval is not None:
+                component_update_intervals.append(update_interval)
+            else:
+                component_update_intervals.append(self.max_update_interval)
+            for requirement in extension.get_requirements():
+                self._load_provider(requirement)
+
+        try:
+            update_interval = min(min(component_update_intervals), self.max_update_interval)
+        except (TypeError, ValueError):
+            update_interval = self.max_update_interval
+
+        ordered_providers_tags = self._topological_sort(self._loaded_providers.copy())
+        return tuple(ordered_providers_tags), update_interval
+
+    def reset(self):
+        """Prepare the ProgressIndicator instance for a new task.
+
+        All stats of the previous task are discarded, while components and
+        registered providers are kept. `begin` should be called again
+        afterwards, either explicitly or by iterating over the instance.
+        """
+        with self._frame_lock:
+            self._is_allowed_to_publish = False
+        if _live_indicators is not None:
+            _live_indicators.discard(self)
+        self._stats = dict()
+        self._loaded_providers = dict()
+        self._publish_hooks = []
+        self._iterator = None
+        self._iterated_count = 0
+        self._prefix_sums = None
+        self._weight = None
+        self._iterated_weight = 0
+        self._published_value = None
+        self._snapshot = MappingProxyType({})
+        self._printed_char_num = 0
 
     def __next__(self):
         try:
             value = next(self._iterator)
+        except StopIteration:
             if self._stats.get(TAG_BEGIN_TIME, None) is None:
                 self.begin()
-            else:
-                self.publish(value)
-            return value
-        except StopIteration:
             self.end()
             raise
+        if self._stats.get(TAG_BEGIN_TIME, None) is None:
+            self.begin()
+        else:
+            # Publishes the number or weight of items processed so far.
+            self._iterated_count += 1
+            if self._prefix_sums is not None:
+                progress = self._prefix_sums[self._iterated_count]
+            elif self._weight is not None:
+                progress = self._iterated_weight
+            else:
+                progress = self._iterated_count
+            if progress > self.max_value:
+                self.set_max_value(progress)
+            self.publish(progress)
+        if self._weight is not None:
+            self._iterated_weight += self._weight(value)
+        return value
 
     # Fix for python 2
     next = __next__
 
-    def __call__(self, iterable):
-        self._iterator = iter(iterable)
+    def __call__(self, iterable, total=None, weight=None):
+        """Wrap `iterable` to display progress while iterating over it.
+
+        Progress is the number of items processed. The total is the length
+        of `iterable`. If it has no length, `total` is used as an estimate,
+        which is raised whenever more items are processed, else the
+        Progress indicator is indeterminate.
+
+        If items take unequal time to process, e.g. files of different
+        sizes, a `weight` can be given for each of them. Progress is then
+        the sum of the weights of the items processed, so the percentage
+        and the estimates of time left follow the work done. If the weights
+        of all items are given as a sequence, their cumulative sums are
+        computed once, so each item costs a single lookup. A `weight`
+        function is called once per item as it is processed, so `total`
+        should be given as the estimated sum of the weights.
+
+        Parameters
+        ----------
+        iterable : iterable
+            The items to iterate over.
+
+        total : int or float, optional
+            Estimated number of items, or sum of their weights if `weight`
+            is given, used if the total is not known in advance.
+
+        weight : callable or sequence, optional
+            Function returning the weight of an item, or sequence of the
+            weights of all items, which must be as many as the items of
+            `iterable` if it has a length, else ValueError is raised. If
+            None, all items weigh 1.
+        """
+        self.reset()
         self.min_value = 0
+        if weight is not None and not callable(weight):
+            prefix_sums = [0]
+            for item_weight in weight:
+                prefix_sums.append(prefix_sums[-1] + item_weight)
+            if (hasattr(iterable, '__len__')
+                    and len(iterable) != len(prefix_sums) - 1):
+                raise ValueError("{} weights given for {} items".format(
+                    len(prefix_sums) - 1, len(iterable)))
+            self._iterator = iter(iterable)
+            self._prefix_sums = prefix_sums
+            self.max_value = prefix_sums[-1]
+            return self
+        self._weight = weight
+        self._iterator = iter(iterable)
         try:
-            self.max_value = len(iterable) - 1
+            if weight is not None:
+                raise TypeError
+            self.max_value = len(iterable)
         except TypeError:
-            self.max_value = float('inf')
+            self.max_value = float('inf') if total is None else total
         return self
 
+    def advance(self, weight=1, worker=None):
+        """Add `weight` to the progress and update the progress bar.
+
+        Useful when the cost of each unit of work is known as it is done,
+        e.g. the number of bytes written, rather than the progress itself.
+
+        Parameters
+        ----------
+        weight : float or int, optional
+            Progress made since the last call to `publish` (Default 1).
+
+        worker : hashable, optional
+            Identifier of the worker making progress, see `publish`.
+        """
+        value = self._published_value
+        if value is None:
+            value = self.min_value
+        self.publish(value + weight, worker)
+
     def __iter__(self):
         return self
 
@@ -199,6 +560,11 @@ class ProgressIndicator:
             if sys.version_info[:2] < (3, 3):
                 flush = kwargs.pop('flush', False)
                 file = kwargs.get('file', sys.stdout)
+                if getattr(file, 'encoding', None) is None:
+                    # Unicode would be encoded as ASCII, e.g. when the
+                    # stream is redirected.
+                    args = [arg.encode('utf-8') if isinstance(arg, _text_type) else arg
+                            for arg in args]
                 print(*args, **kwargs)
                 if flush and (file is not None):
                     file.flush()
@@ -216,10 +582,13 @@ class ProgressIndicator:
         """
         if not isinstance(provider, BaseProvider):
             raise TypeError("provider must be of type BaseProvider, not {}".format(type(provider).__name__))
-        tag = provider.get_tag()
-        if tag in self._registered_providers:
-            raise ValueError("Another provider exists for the tag {}".format(tag))
-        self._registered_providers[tag] = provider
+        tags = provider.get_tags()
+        for tag in tags:
+            if tag in self._registered_providers:
+                raise ValueError("Another provider exists for the tag {}".format(tag))
+        for tag in tags:
+            self._registered_providers[tag] = provider
+        self._providers_key = None
 
     def deregister_provider(self, tag):
         """All providers can be deregistered using this method.
@@ -233,42 +602,108 @@ class ProgressIndicator:
         ----
         For optimization purposes, You don't need to deregister providers if
         they are not needed as Providers which are not required are never executed.
+
+        If the provider provides several tags, only `tag` is removed and the
+        provider keeps providing its other tags. Another provider can then
+        be registered for `tag`.
         """
         try:
             self._registered_providers.pop(tag)
+            self._providers_key = None
         except KeyError:
             # To support python version prior to 3.3
             exc = ValueError("No provider exists for the tag {}".format(tag))
             exc.__cause__ = None
             raise exc
 
+    def _get_provider(self, tag):
+        registered_providers = self._registered_providers
+        try:
+            provider = registered_providers[tag]
+        except KeyError:
+            provider = _BUILTIN_PROVIDERS[tag]()
+            for provided_tag in provider.get_tags():
+                registered_providers.setdefault(provided_tag, provider)
+            self._providers_key = None
+        if not isinstance(provider, BaseProvider):
+            # Default providers are registered as factories. A provider of
+            # several tags is shared by all tags still registered to it.
+            factory = provider
+            provider = factory()
+            for provided_tag in provider.get_tags():
+                if registered_providers.get(provided_tag) is factory:
+                    registered_providers[provided_tag] = provider
+        return provider
+
+    def _get_providers_key(self):
+        if self._providers_key is None:
+            signatures = []
+            for tag, provider in self._registered_providers.items():
+                if isinstance(provider, BaseProvider):
+                    signatures.append((tag, type(provider),
+                                       provider.get_tags(),
+                                       tuple(provider.get_requirements())))
+                else:
+                    signatures.append((tag, provider))
+            self._providers_key = frozenset(signatures)
+        return self._providers_key
+
     def _load_provider(self, tag):
         if tag not in self._loaded_providers:
             try:
-                provider = self._registered_providers[tag]
+                provider = self._get_provider(tag)
             except KeyError:
                 pass
             else:
+                for provided_tag in provider.get_tags():
+                    if self._registered_providers.get(provided_tag) is provider:
+                        self._loaded_providers[provided_tag] = provider
+                        self._stats[provided_tag] = None
                 required_tags = provider.get_requirements()
                 for required_tag in required_tags:
                     self._load_provider(required_tag)
-                self._loaded_providers[tag] = provider
-                self._stats[tag] = None
+
+    def _get_outputs(self, data):
+        """Group the tags in `data`, mapping tags to loaded providers, by
+        provider.
+
+        Returns
+        -------
+        dict:
+            Maps the first loaded tag of each provider to None if it is the
+            only tag of the provider, else to a tuple of (tag, index) of all
+            loaded tags of the provider, where index is the position of the
+            tag in the value of the provider.
+        """
+        outputs = {}
+        for provider in set(data.values()):
+            tags = provider.get_tags()
+            loaded = tuple((tag, index) for index, tag in enumerate(tags)
+                           if data.get(tag) is provider)
+            if len(tags) == 1:
+                outputs[loaded[0][0]] = None
+            else:
+                outputs[loaded[0][0]] = loaded
+        return outputs
 
     def _topological_sort(self, data):
-        data.update((i, set(data[i].get_requirements())) for i in data)
+        outputs = self._get_outputs(data)
+        # Providers of several tags are sorted as a single node named after
+        # their first loaded tag.
+        names = dict((data[tag], tag) for tag in outputs)
+        graph = {}
+        for tag in outputs:
+            requirements = data[tag].get_requirements()
+            graph[tag] = set(names.get(data.get(i), i) for i in requirements) - set([tag])
+        data = graph
         ordered_list = []
-        from functools import reduce
-        try:
-            extra_items = reduce(set.union, data.values()) - set(data.keys())
-        except TypeError:
-            extra_items = set()
+        extra_items = set().union(*data.values()) - set(data.keys())
         data.update({item:set() for item in extra_items})
         while True:
             ordered = set(item for item, dep in data.items() if not dep)
             if not ordered:
                 break
-            ordered_providers = [i for i in ordered if i in self._registered_providers]
+            ordered_providers = [(i, outputs[i]) for i in ordered if i in outputs]
             ordered_list.extend(ordered_providers)
             data = {item: (dep - ordered)
                     for item, dep in data.items()
@@ -278,7 +713,7 @@ class ProgressIndicator:
         else:
             return ordered_list
 
-    def publish(self, value=None):
+    def publish(self, value=None, worker=None):
         """Update the progress bar.
 
         Parameters
@@ -286,24 +721,148 @@ class ProgressIndicator:
         value : float or int
             The current progress in percentage. It should be between
             `min_value` and `max_value`.
+
+        worker : hashable, optional
+            Identifier of the worker making progress, when several threads
+            or processes publish to the same indicator. If None, providers
+            attributing progress to workers use the name of the current
+            thread.
         """
-        time_curr = time.time()
         stats = self._stats
         stats[TAG_ITERATIONS] += 1
+        self._published_value = value
+        if self._is_counting_only:
+            # Nothing observes this call, so the clock is not even read.
+            if stats[TAG_ITERATIONS] >= self._headless_update_at:
+                self._update_headless(self.clock())
+            return
+        time_curr = self.clock()
+        if self.recorder is not None:
+            self.recorder.on_publish(time_curr, value, stats[TAG_ITERATIONS])
+        if self.history is not None:
+            self.history.on_publish(time_curr, value)
+        for hook in self._publish_hooks:
+            hook(time_curr, value, worker)
+
+        if not self._is_allowed_to_print:
+            if stats[TAG_ITERATIONS] >= self._headless_update_at:
+                self._update_headless(time_curr)
+        elif self._is_update_due(time_curr, stats[TAG_ITERATIONS], value):
+            self._update(time_curr, value)
+
+    def set_max_value(self, max_value):
+        """Change the value at which the task is complete.
+
+        This can be called while a task is underway, e.g. when work is added
+        to or removed from a queue being drained. The percentage, estimates
+        of time left and the Progress Bar follow the new value from the next
+        update, `refresh` redraws the Progress Bar immediately.
 
-        time_since_update = time_curr - stats[TAG_LAST_UPDATED_AT]
+        Parameters
+        ----------
+        max_value : float or int
+            New maximum value of the progress. It should not be less than
+            `min_value`, nor than the last published value.
+        """
+        if max_value < self.min_value:
+            raise ValueError("max_value should not be less than min_value")
+        if self._is_allowed_to_publish:
+            value = self._published_value
+            if value is not None and value > max_value:
+                raise ValueError(
+                    "max_value should not be less than the last published "
+                    "value {}".format(value))
+            if self.recorder is not None:
+                self.recorder.on_max_value(self.clock(), max_value)
+            self._stats[TAG_MAX_VALUE] = max_value
+        self.max_value = max_value
 
-        if time_since_update < self._update_interval:
-            try:
-                if (value - stats[TAG_VALUE]) < (0.1 * self._range):
-                    return
-            except TypeError:
-                return
+    def _update_publish_mode(self):
+        # While printing is not allowed, calls to publish are only counted
+        # unless a recorder, a history or a provider observes them.
+        self._is_counting_only = not (self._is_allowed_to_print
+                                      or self.recorder is not None
+                                      or self.history is not None
+                                      or self._publish_hooks)
+
+    def _update_headless(self, time_curr):
+        # Stats are brought up to date about every `max_update_interval`
+        # while printing is not allowed, counted in iterations at the last
+        # measured rate so the clock is not read on every call.
+        stats = self._stats
+        iterations = stats[TAG_ITERATIONS]
+        time_prev = stats[TAG_LAST_UPDATED_AT]
+        self._update(time_curr, self._published_value)
+        count = iterations - self._headless_iterations
+        self._headless_iterations = iterations
+        # The step at most doubles, as the first calls may be much faster
+        # than the following ones.
+        step = 2 * count
+        if time_curr > time_prev:
+            step = min(step, int(count * self.max_update_interval / (time_curr - time_prev)))
+        self._headless_update_at = iterations + max(step, 1)
+
+    def refresh(self):
+        """Update the progress bar without publishing any progress.
+
+        Time based stats are brought up to date and the Progress Bar is
+        redrawn with the last published value. This does nothing if the task
+        is not underway.
+        """
+        if self._is_allowed_to_publish:
+            self._update(self.clock(), self._published_value)
+
+    def get_stats(self):
+        """Get the current value of all tags.
+
+        Time based stats and the values of all loaded providers are brought
+        up to date with the last published value, without redrawing the
+        Progress Bar. This is the way to query progress while printing is
+        not allowed.
+
+        Returns
+        -------
+        dict:
+            Mapping of tags to their current value.
+        """
+        if self._is_allowed_to_publish:
+            self._update_stats(self.clock(), self._published_value)
+        return dict(self._stats)
+
+    def snapshot(self):
+        """Get the value of all tags as of the last update, from any thread.
+
+        Stats are updated in place by the thread publishing progress, so
+        reading them from another thread may mix values of two updates.
+        Instead, a copy of all stats is made after each update and replaced
+        as a whole, so the snapshot is consistent without any lock. Stats
+        updated on every publish, such as `iterations`, are as of the last
+        update as well. In headless mode, stats are updated about every
+        `max_update_interval` without drawing the Progress Bar. The tags
+        `latency` and `history`, whose values are updated in place, are left
+        out; their summaries such as `latency_p50` are included.
+
+        Returns
+        -------
+        mapping:
+            Read-only mapping of tags to their value as of the last update.
+            It is empty before the first `begin`.
+        """
+        return self._snapshot
+
+    def _update(self, time_curr, value):
+        self._update_stats(time_curr, value)
+        with self._frame_lock:
+            if self._is_allowed_to_print:
+                self._fire_extensions_event('on_update')
+            self._update_progress_bar()
 
-        stats[TAG_TIME_SINCE_UPDATE] = time_since_update
+    def _update_stats(self, time_curr, value):
+        stats = self._stats
+        stats[TAG_TIME_SINCE_UPDATE] = time_curr - stats[TAG_LAST_UPDATED_AT]
         time_ = stats[TAG_TIME_SINCE_BEGIN]
-        stats[TAG_TIME_SINCE_BEGIN] = time_curr - self._stats[TAG_BEGIN_TIME]
-        stats[TAG_DELTATIME] = self._stats[TAG_TIME_SINCE_BEGIN] - time_
+        stats[TAG_TIME_SINCE_BEGIN] = time_curr - stats[TAG_BEGIN_TIME]
+        stats[TAG_DELTATIME] = stats[TAG_TIME_SINCE_BEGIN] - time_
 
         if value is not None:
             if self.min_value <= value <= self.max_value:
@@ -321,37 +880,101 @@ class ProgressIndicator:
         except (TypeError, ZeroDivisionError):
             stats[TAG_PERCENTAGE] = None
 
-        self._fire_event('on_update')
-        self._update_progress_bar()
+        self._fire_providers_event('on_update')
 
     def _update_progress_bar(self):
         """Updates Progress Bar."""
-        self._stats[TAG_LAST_UPDATED_AT] = time.time()
+        stats = self._stats
+        stats[TAG_LAST_UPDATED_AT] = self.clock()
+        self._snapshot = _make_snapshot(stats)
+        self.update_policy.on_update(stats[TAG_LAST_UPDATED_AT],
+                                     stats[TAG_ITERATIONS], stats[TAG_VALUE])
+        if not self._is_allowed_to_print:
+            return
+        self._draw()
+
+    def _draw(self):
+        """Renders the current value of all components and prints it."""
+        progress_bar = self._render()
+        if self.display is not None:
+            self.display.on_frame(self)
+            return
+        # Overwrite previous printed content
+        # This reduces flicker as compared to clearing and then writing.
+        self._print_if_allowed(progress_bar, end='', file=self.stream, flush=False)
+        bar_length_diff = self._printed_char_num - self._last_frame_width
+        # Clear characters which are not overwritten
+        if bar_length_diff > 0:
+            self._print_if_allowed(' ' * bar_length_diff, end='', file=self.stream, flush=False)
+        self._print_if_allowed('\r', end='', file=self.stream, flush=True)
+        self._printed_char_num = self._last_frame_width
+
+    def _render(self):
+        """Joins the output of all components and caches it as last frame,
+        along with its width on the terminal."""
         result = []
+        width = 0
         for component in self.components:
             if isinstance(component, BaseExtension):
                 value = component.get_value()
-                if not isinstance(value, str):
+                if not isinstance(value, _string_types):
                     raise TypeError("{} instance's 'get_value' method returned {}, expected 'str'".format(type(component).__name__, type(value)))
-                result.append(value)
-            elif isinstance(component, str):
-                result.append(component)
+            elif isinstance(component, _string_types):
+                value = component
             else:
                 raise ValueError("component was of type {}, expected 'str' or an extension".format(type(component).__name__))
+            result.append(value)
+            width += get_width(value)
 
-        progress_bar = self.seperator.join(result)
-        # Overwrite previous printed content
-        # This reduces flicker as compared to clearing and then writing.
-        self._print_if_allowed(progress_bar, end='', file=self.stream, flush=False)
-        bar_length_diff = self._printed_char_num - len(progress_bar)
-        # Clear characters which are not overwritten
-        if bar_length_diff > 0:
-            self._print_if_allowed(' ' * bar_length_diff, end='', file=self.stream, flush=False)
-        self._print_if_allowed('\r', end='', file=self.stream, flush=True)
-        self._printed_char_num = len(progress_bar)
+        if result:
+            width += get_width(self.seperator) * (len(result) - 1)
+        self._last_frame = self.seperator.join(result)
+        self._last_frame_width = width
+        return self._last_frame
+
+    def write(self, text):
+        """Write `text` to `stream` above the Progress Bar.
+
+        The Progress Bar is cleared, `text` is written and the last frame is
+        redrawn from cache in a single write, without updating providers and
+        extensions. If no Progress Bar is drawn, e.g. while printing is not
+        allowed, `text` is written as is.
+
+        Parameters
+        ----------
+        text : str
+            Text to write. It should end with a line ending.
+        """
+        with self._frame_lock:
+            if self.display is not None:
+                self.display.write_above(text)
+            elif self._is_allowed_to_print and self._last_frame is not None:
+                progress_bar = self._last_frame
+                self._print_if_allowed('\r' + ' ' * self._printed_char_num + '\r'
+                                       + text + progress_bar + '\r',
+                                       end='', file=self.stream, flush=True)
+                self._printed_char_num = self._last_frame_width
+            else:
+                stream = sys.stdout if self.stream is None else self.stream
+                stream.write(text)
+                stream.flush()
+
+    def get_last_frame(self):
+        """Get the Progress Bar as it was last drawn.
+
+        Returns
+        -------
+        str or None:
+            The last drawn Progress Bar, or None if it has never been drawn.
+        """
+        return self._last_frame
 
     def _clear_progress_bar(self):
         """Clears printed characters by `ProgressIndicator` instance."""
+        self._last_frame = None
+        if self.display is not None:
+            self.display.on_frame(self)
+            return
         self._print_if_allowed(' ' * self._printed_char_num,
                                end='\r',
                                file=self.stream,
@@ -361,13 +984,40 @@ class ProgressIndicator:
     def allow_to_print(self, is_allowed_to_print):
         """Set whether ProgressIndicator instance is allowed to print to console.
 
+        While printing is not allowed, extensions are not updated and the
+        Progress Bar is not rendered. Calls to `publish` are still passed to
+        the recorder, the history and providers overriding `on_publish`; if
+        there are none, they only count iterations and remember the
+        published value, so they cost next to nothing. Stats and `snapshot`
+        are brought up to date about every `max_update_interval`, estimated
+        from the rate of calls so the clock is not read on every call. Use
+        `get_stats` to query progress on demand. When printing is allowed
+        again while a task is underway, extensions are updated with the
+        current stats and the Progress Bar is redrawn.
+
         Parameters
         ----------
 
         is_allowed_to_print : bool
             Whether ProgressIndicator instance has permission to print.
         """
-        self._is_allowed_to_print = is_allowed_to_print
+        if is_allowed_to_print and not self._is_allowed_to_print:
+            self._is_allowed_to_print = True
+            self._update_publish_mode()
+            if self._is_allowed_to_publish:
+                if not self._are_extensions_begun:
+                    # The task was begun while printing was not allowed.
+                    with self._frame_lock:
+                        self._fire_extensions_event('on_begin')
+                    self._are_extensions_begun = True
+                # Extensions were not kept up to date meanwhile.
+                self._update(self.clock(), self._published_value)
+        elif not is_allowed_to_print:
+            self._is_allowed_to_print = False
+            self._update_publish_mode()
+            if self._is_allowed_to_publish:
+                self._headless_update_at = self._stats[TAG_ITERATIONS] + 1
+                self._headless_iterations = self._stats[TAG_ITERATIONS]
 
 
 class SimpleProgressBar(ProgressIndicator):
@@ -1,6 +1,8 @@
 """This module contains the Built-in Extensions for ProgressIndicator class."""
 from __future__ import division
-from .base import BaseExtension
+import datetime
+import threading
+from .base import BaseExtension, memoize, significant_digits
 from .tags import *
 
 
@@ -40,6 +42,8 @@ class Bar(BaseExtension):
     def _get_entity_count(self, percentage):
         return int(percentage * self.length / 100)
 
+    @memoize(attributes=('length', 'begin_entity', 'filler_entity',
+                         'empty_entity', 'end_entity'))
     def _get_bar(self, filler_count):
         bar = (self.begin_entity
                + (self.filler_entity * filler_count)
@@ -175,9 +179,9 @@ class Timer(BaseExtension):
     def on_invalidated(self, params):
         self.set_value('UNKNOWN')
 
+    @memoize(int)
     def _get_formatted_time(self, time):
-        import datetime
-        return str(datetime.timedelta(0, int(time), 0))
+        return str(datetime.timedelta(0, time, 0))
 
 
 class ETA(Timer):
@@ -196,6 +200,35 @@ class ETA1(Timer):
         BaseExtension.__init__(self, requirements=[TAG_ETA1])
 
 
+class TrendETA(Timer):
+    """This Extension displays the expected time left for the task to be
+    completed, extrapolated from the recent trend of progress.
+
+    Parameters
+    ----------
+    show_interval : bool, optional
+        Whether the 95% confidence interval is displayed as well
+        (Default False).
+    """
+    def __init__(self, show_interval=False):
+        requirements = [TAG_ETA_TREND]
+        if show_interval:
+            requirements += [TAG_ETA_TREND_LOW, TAG_ETA_TREND_HIGH]
+        BaseExtension.__init__(self, requirements=requirements)
+        self.show_interval = show_interval
+
+    def on_update(self, params):
+        if params[0] is None:
+            self.set_value('UNKNOWN')
+            return
+        value = self._get_formatted_time(params[0])
+        if self.show_interval:
+            low, high = [self._get_formatted_time(i) if i is not None else '?'
+                         for i in params[1:]]
+            value = "{} ({} - {})".format(value, low, high)
+        self.set_value(value)
+
+
 class Rate(BaseExtension):
     """This Extension displays the rate at which calls to `publish` are made.
     """
@@ -203,13 +236,92 @@ class Rate(BaseExtension):
         BaseExtension.__init__(self, requirements=[TAG_RATE])
 
     def on_validated(self, params):
-        rate = params[0]
-        self.set_value(str(int(rate)) + ' iters/s')
+        self.set_value(self._get_formatted_rate(params[0]))
+
+    @memoize(int)
+    def _get_formatted_rate(self, rate):
+        return str(rate) + ' iters/s'
 
     def on_invalidated(self, params):
         self.set_value('UNKNOWN')
 
 
+class Sparkline(BaseExtension):
+    """This Extension displays the rate at which calls to `publish` are made
+    over the last `width` updates as a sparkline, scaled between the lowest
+    and highest of these rates.
+
+    Rates are kept in a preallocated ring buffer, along with their minimum
+    and maximum, so each update costs O(`width`).
+
+    Parameters
+    ----------
+    width : int, optional
+        Number of rates displayed (Default 20).
+
+    entities : str, optional
+        Symbols for increasing rates (Default the Unicode block elements
+        from one to eight eighths).
+    """
+    def __init__(self, width=20,
+                 entities=u'\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588'):
+        BaseExtension.__init__(self, requirements=[TAG_RATE])
+        self.width = width
+        self.entities = entities
+        self._clear()
+
+    def _clear(self):
+        self._rates = [0.0] * self.width
+        self._next = 0
+        self._count = 0
+        self._min = self._max = None
+
+    def _push(self, rate):
+        rates = self._rates
+        evicted = rates[self._next] if self._count == self.width else None
+        rates[self._next] = rate
+        self._next = (self._next + 1) % self.width
+        if evicted is None:
+            self._count += 1
+            if self._min is None or rate < self._min:
+                self._min = rate
+            if self._max is None or rate > self._max:
+                self._max = rate
+        elif evicted == self._min or evicted == self._max:
+            # The extremum may have been evicted.
+            self._min = min(rates)
+            self._max = max(rates)
+        else:
+            if rate < self._min:
+                self._min = rate
+            if rate > self._max:
+                self._max = rate
+
+    def _get_sparkline(self):
+        rates, entities, width = self._rates, self.entities, self.width
+        low = self._min
+        try:
+            scale = (len(entities) - 1) / (self._max - low)
+        except ZeroDivisionError:
+            # All rates are equal.
+            return ' ' * (width - self._count) + entities[len(entities) // 2] * self._count
+        start = self._next - self._count
+        return ' ' * (width - self._count) + ''.join(
+            [entities[int((rates[i % width] - low) * scale)]
+             for i in range(start, self._next)])
+
+    def on_begin(self, params):
+        self._clear()
+        self.set_value(' ' * self.width)
+
+    def on_validated(self, params):
+        self._push(params[0])
+        self.set_value(self._get_sparkline())
+
+    def on_invalidated(self, params):
+        self.set_value(' ' * self.width)
+
+
 class Percentage(BaseExtension):
     """This Extension displays percentage of the task completed.
     """
@@ -217,8 +329,168 @@ class Percentage(BaseExtension):
         BaseExtension.__init__(self, requirements=[TAG_PERCENTAGE])
 
     def on_validated(self, params):
-        percentage = params[0]
-        self.set_value("{:0=2}%".format(int(percentage)))
+        self.set_value(self._get_formatted_percentage(params[0]))
+
+    @memoize(int)
+    def _get_formatted_percentage(self, percentage):
+        return "{:0=2}%".format(percentage)
+
+    def on_invalidated(self, params):
+        self.set_value('UNKNOWN')
+
+
+class Latency(BaseExtension):
+    """This Extension displays the median, 95th and 99th percentile of the
+    time between successive calls to `publish`.
+    """
+    def __init__(self):
+        BaseExtension.__init__(self, requirements=[TAG_LATENCY_P50,
+                                                   TAG_LATENCY_P95,
+                                                   TAG_LATENCY_P99])
+
+    def _get_formatted_duration(self, duration):
+        if duration < 1e-3:
+            return "{:.0f}us".format(duration * 1e6)
+        elif duration < 1:
+            return "{:.1f}ms".format(duration * 1e3)
+        return "{:.2f}s".format(duration)
+
+    @memoize(significant_digits(3))
+    def _get_formatted_latency(self, p50, p95, p99):
+        return "p50: {} p95: {} p99: {}".format(
+            *[self._get_formatted_duration(i) for i in (p50, p95, p99)])
+
+    def on_validated(self, params):
+        self.set_value(self._get_formatted_latency(*params))
+
+    def on_invalidated(self, params):
+        self.set_value('UNKNOWN')
+
+
+def _format_amount(amount, unit):
+    # Uses binary prefixes for bytes and decimal ones for anything else.
+    if unit == 'B':
+        base, prefixes = 1024, ('', 'Ki', 'Mi', 'Gi', 'Ti', 'Pi')
+    else:
+        base, prefixes = 1000, ('', 'k', 'M', 'G', 'T', 'P')
+    for prefix in prefixes[:-1]:
+        if abs(amount) < base:
+            break
+        amount /= base
+    else:
+        prefix = prefixes[-1]
+    if not prefix or abs(amount) >= 100:
+        digits = 0
+    elif abs(amount) >= 10:
+        digits = 1
+    else:
+        digits = 2
+    return "{:.{}f} {}{}".format(amount, digits, prefix, unit)
+
+
+class Size(BaseExtension):
+    """This Extension displays the value of the progress as an amount, e.g.
+    the number of bytes processed, with a binary prefix for bytes and a
+    decimal prefix for other units.
+
+    Parameters
+    ----------
+    unit : str, optional
+        Unit of the value (Default 'B').
+    """
+    def __init__(self, unit='B'):
+        BaseExtension.__init__(self, requirements=[TAG_VALUE])
+        self.unit = unit
+
+    @memoize(significant_digits(3), attributes=('unit',))
+    def _get_formatted_size(self, value):
+        return _format_amount(value, self.unit)
+
+    def on_validated(self, params):
+        self.set_value(self._get_formatted_size(params[0]))
+
+    def on_invalidated(self, params):
+        self.set_value(_format_amount(0, self.unit))
+
+
+class Throughput(BaseExtension):
+    """This Extension displays the amount of progress made per second, e.g.
+    the number of bytes processed per second.
+
+    Parameters
+    ----------
+    unit : str, optional
+        Unit of the value (Default 'B').
+    """
+    def __init__(self, unit='B'):
+        BaseExtension.__init__(self, requirements=[TAG_THROUGHPUT])
+        self.unit = unit
+
+    @memoize(significant_digits(3), attributes=('unit',))
+    def _get_formatted_throughput(self, throughput):
+        return _format_amount(throughput, self.unit) + '/s'
+
+    def on_validated(self, params):
+        self.set_value(self._get_formatted_throughput(params[0]))
 
     def on_invalidated(self, params):
         self.set_value('UNKNOWN')
+
+
+class StallMarker(BaseExtension):
+    """This Extension displays a marker while a `Watchdog` considers the task
+    stalled.
+
+    Parameters
+    ----------
+    marker : str, optional
+        The text displayed while the task is stalled (Default 'STALLED').
+    """
+    def __init__(self, marker='STALLED'):
+        BaseExtension.__init__(self, requirements=[TAG_STALLED])
+        self.marker = marker
+
+    def on_validated(self, params):
+        self.set_value("{} {:.1f}s".format(self.marker, params[0]))
+
+    def on_invalidated(self, params):
+        self.set_value('')
+
+
+class Stragglers(BaseExtension):
+    """This Extension displays the slowest workers publishing to the
+    indicator, and how long they have been idle if they have not published
+    recently. Workers identified by the publishing thread are shown by the
+    name of the thread while it is alive.
+
+    Parameters
+    ----------
+    count : int, optional
+        Number of workers displayed (Default 3).
+
+    idle_after : float, optional
+        Time(sec) without publish after which a worker is shown as idle
+        (Default 5).
+    """
+    def __init__(self, count=3, idle_after=5):
+        BaseExtension.__init__(self, requirements=[TAG_WORKER_RATE,
+                                                   TAG_WORKER_IDLE])
+        self.count = count
+        self.idle_after = idle_after
+
+    def on_validated(self, params):
+        rates, idle = params
+        workers = sorted((worker for worker in rates if rates[worker] is not None),
+                         key=rates.__getitem__)[:self.count]
+        names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+        parts = []
+        for worker in workers:
+            name = names.get(worker, worker)
+            if idle[worker] >= self.idle_after:
+                parts.append("{} idle {:.0f}s".format(name, idle[worker]))
+            else:
+                parts.append("{} {:.1f}/s".format(name, rates[worker]))
+        self.set_value("slowest: " + ", ".join(parts) if parts else '')
+
+    def on_invalidated(self, params):
+        self.set_value('')
@@ -0,0 +1,94 @@
+"""This module contains a logging handler and a stream wrapper which write
+above a live Progress Bar instead of through it."""
+import logging
+
+
+class ProgressLogHandler(logging.Handler):
+    """Logging handler which writes records above a Progress Bar.
+
+    Formatted records are buffered and written with `ProgressIndicator.write`,
+    which clears the Progress Bar, writes all buffered records and redraws
+    the last frame in a single write, without updating providers and
+    extensions.
+
+    Parameters
+    ----------
+    indicator : ProgressIndicator
+        The indicator records are written above. Records are written to its
+        `stream`.
+
+    level : int, optional
+        Minimum level of handled records (Default logging.NOTSET).
+
+    capacity : int, optional
+        Number of records buffered before they are written (Default 1).
+
+    flush_level : int, optional
+        Records of at least this level are written immediately, together
+        with all buffered records (Default logging.WARNING).
+    """
+    def __init__(self, indicator, level=logging.NOTSET, capacity=1,
+                 flush_level=logging.WARNING):
+        logging.Handler.__init__(self, level)
+        self.indicator = indicator
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer = []
+
+    def emit(self, record):
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.capacity or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                text = '\n'.join(self._buffer) + '\n'
+                self._buffer = []
+                self.indicator.write(text)
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        logging.Handler.close(self)
+
+
+class ProgressStream(object):
+    """File-like object which writes complete lines above a Progress Bar.
+
+    Useful to redirect `sys.stdout` while a Progress Bar is drawn on the same
+    terminal. Text is buffered until a line ending is written or the stream
+    is closed.
+
+    Parameters
+    ----------
+    indicator : ProgressIndicator
+        The indicator text is written above.
+    """
+    def __init__(self, indicator):
+        self.indicator = indicator
+        self._buffer = ''
+
+    def write(self, text):
+        self._buffer += text
+        index = self._buffer.rfind('\n')
+        if index >= 0:
+            self.indicator.write(self._buffer[:index + 1])
+            self._buffer = self._buffer[index + 1:]
+
+    def flush(self):
+        # Incomplete lines are kept until a line ending is written, as
+        # they can not be written above the Progress Bar.
+        pass
+
+    def close(self):
+        """Write any incomplete line."""
+        if self._buffer:
+            self.indicator.write(self._buffer + '\n')
+            self._buffer = ''
@@ -0,0 +1,202 @@
+"""This module contains a fixed-memory history of the progress of a task, for
+trend analysis of tasks running for hours or days.
+
+The history is kept in the style of a round-robin database: several archives
+of fixed size store points at increasing time resolutions. Each archive
+keeps one point per interval of its resolution, i.e. the last published
+value in the interval and the average rate over it. When an interval of an
+archive is over, its point is stored, overwriting the oldest one, and passed
+on to the next coarser archive. Memory is bounded by the sizes of the
+archives, whatever the number of publishes or the duration of the task.
+
+Assign an instance to the `history` attribute of a `ProgressIndicator` before
+calling `begin`. It is then available to extensions and providers as the
+`history` tag. Every published value is recorded, also while printing is
+not allowed, e.g. for jobs running without a terminal.
+"""
+from __future__ import division
+import array
+import math
+
+_NAN = float('nan')
+
+# (resolution(sec), size) of the default archives: 5 minutes at 1 second,
+# 12 hours at 1 minute and 30 days at 1 hour, about 40 kB in total.
+DEFAULT_ARCHIVES = ((1, 300), (60, 720), (3600, 720))
+
+
+class _Archive(object):
+    def __init__(self, resolution, size):
+        self.resolution = resolution
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        self.times = array.array('d', [_NAN]) * self.size
+        self.values = array.array('d', [_NAN]) * self.size
+        self.rates = array.array('d', [_NAN]) * self.size
+        self.count = 0
+        self._next = 0
+        self._bucket = None
+        self._time = self._value = None
+        self._time_prev = self._value_prev = None
+
+    def _get_rate(self):
+        try:
+            return (self._value - self._value_prev) / (self._time - self._time_prev)
+        except ZeroDivisionError:
+            return _NAN
+
+    def add(self, time_, value):
+        # Returns the point of the interval which is over, if any.
+        bucket = time_ // self.resolution
+        if bucket == self._bucket:
+            self._time, self._value = time_, value
+            return None
+        point = self.close()
+        if self._time_prev is None:
+            self._time_prev, self._value_prev = time_, value
+        self._bucket = bucket
+        self._time, self._value = time_, value
+        return point
+
+    def close(self):
+        # Stores the point of the current interval, if any.
+        if self._time is None:
+            return None
+        next_ = self._next
+        self.times[next_] = self._time
+        self.values[next_] = self._value
+        self.rates[next_] = self._get_rate()
+        self._next = (next_ + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        point = (self._time, self._value)
+        self._time_prev, self._value_prev = point
+        self._time = self._value = self._bucket = None
+        return point
+
+    def get_points(self):
+        start = (self._next - self.count) % self.size
+        points = [(self.times[i % self.size], self.values[i % self.size],
+                   self.rates[i % self.size])
+                  for i in range(start, start + self.count)]
+        if self._time is not None:
+            points.append((self._time, self._value, self._get_rate()))
+        return points
+
+
+class History(object):
+    """Fixed-memory history of the value and rate of progress.
+
+    Parameters
+    ----------
+    archives : sequence of tuple, optional
+        (resolution(sec), size) of each archive, from the finest to the
+        coarsest resolution (Default `DEFAULT_ARCHIVES`).
+
+    export_path : str or None, optional
+        If set, the history is written to this file as CSV when the task
+        ends, see `export` (Default None).
+    """
+    def __init__(self, archives=DEFAULT_ARCHIVES, export_path=None):
+        resolutions = [resolution for resolution, _ in archives]
+        if not resolutions or resolutions != sorted(resolutions):
+            raise ValueError("archives should be sorted by resolution")
+        self._archives = [_Archive(resolution, size) for resolution, size in archives]
+        self.export_path = export_path
+
+    def get_resolutions(self):
+        """Get the resolution(sec) of each archive."""
+        return [archive.resolution for archive in self._archives]
+
+    def _add(self, level, time_, value):
+        archives = self._archives
+        while level < len(archives):
+            point = archives[level].add(time_, value)
+            if point is None:
+                return
+            time_, value = point
+            level += 1
+
+    def clear(self):
+        """Discard all points."""
+        for archive in self._archives:
+            archive.clear()
+
+    def record(self, time_, value):
+        """Add a sample of the progress.
+
+        Parameters
+        ----------
+        time_ : float
+            Time of the sample, not earlier than the previous one.
+
+        value : float
+            Progress at `time_`.
+        """
+        self._add(0, time_, value)
+
+    def flush(self):
+        """Store the points of the current interval of all archives."""
+        for level, archive in enumerate(self._archives):
+            point = archive.close()
+            if point is not None:
+                self._add(level + 1, *point)
+
+    def get_points(self, level=0):
+        """Get the points of an archive.
+
+        Parameters
+        ----------
+        level : int, optional
+            Index of the archive, 0 being the finest resolution (Default 0).
+
+        Returns
+        -------
+        list:
+            (time, value, rate) of each point from the oldest to the most
+            recent. The last point is the one of the current interval, if
+            any. The rate is NaN if it is unknown.
+        """
+        return self._archives[level].get_points()
+
+    def export(self, path):
+        """Write the points of all archives to a CSV file.
+
+        The file has the columns ``resolution``, ``time``, ``value`` and
+        ``rate``, with one row per point from the finest archive to the
+        coarsest one.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file, which is overwritten.
+        """
+        with open(path, 'w') as file_:
+            file_.write('resolution,time,value,rate\n')
+            for archive in self._archives:
+                for time_, value, rate in archive.get_points():
+                    file_.write('{!r},{!r},{!r},{}\n'.format(
+                        archive.resolution, time_, value,
+                        '' if math.isnan(rate) else repr(rate)))
+
+    def on_begin(self, time_, value):
+        """Discard all points and record the initial value."""
+        self.clear()
+        for archive in self._archives:
+            # The first rate of each archive is measured from the beginning.
+            archive._time_prev, archive._value_prev = time_, value
+        self.record(time_, value)
+
+    def on_publish(self, time_, value):
+        """Record a published value, unless it is None."""
+        if value is not None:
+            self._add(0, time_, value)
+
+    def on_end(self, time_, value):
+        """Record the final value, store all points and export them if
+        `export_path` is set."""
+        self.record(time_, value)
+        self.flush()
+        if self.export_path is not None:
+            self.export(self.export_path)
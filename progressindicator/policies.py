@@ -0,0 +1,222 @@
+"""This module contains update policies which decide when a ProgressIndicator
+redraws the Progress Bar.
+
+A policy is consulted on every call to `publish`, so each built-in policy
+decides whether an update is due with a single comparison against a
+threshold which is only recomputed after an update. Policies can be combined
+with ``|`` (any of them is due) and ``&`` (all of them are due).
+
+For example, an interactive session may use the default policy, while a
+batch job writing to a log file may use::
+
+    bar.update_policy = MinInterval(60) | MinValueDelta(10)
+"""
+from __future__ import division
+
+_INF = float('inf')
+
+
+class UpdatePolicy(object):
+    """Base class for all update policies.
+
+    Policies must override `is_due`, and usually `on_update` to recompute
+    the threshold used by `is_due`.
+    """
+    def on_begin(self, indicator):
+        """Called when `indicator` begins a task.
+
+        Parameters
+        ----------
+        indicator : ProgressIndicator
+            The indicator using the policy.
+        """
+        pass
+
+    def on_update(self, time_, iterations, value):
+        """Called after each update of the Progress Bar.
+
+        Parameters
+        ----------
+        time_ : float
+            Time of the update.
+
+        iterations : int
+            Number of calls made to publish.
+
+        value : float or None
+            Last value passed to publish.
+        """
+        pass
+
+    def is_due(self, time_, iterations, value):
+        """Decide whether the Progress Bar should be updated.
+
+        Parameters
+        ----------
+        time_ : float
+            Time at which publish was called.
+
+        iterations : int
+            Number of calls made to publish.
+
+        value : float or None
+            Value passed to publish.
+
+        Returns
+        -------
+        bool:
+            True if an update is due, else False
+        """
+        raise NotImplementedError
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+
+class MinInterval(UpdatePolicy):
+    """Policy which is due once `interval` seconds have passed since the last
+    update.
+
+    Parameters
+    ----------
+    interval : float, optional
+        Minimum time(sec) between two updates. If None, the update interval
+        of the indicator is used, which is the smallest update interval of
+        its extensions and `max_update_interval` (Default None).
+    """
+    def __init__(self, interval=None):
+        self.interval = interval
+        self._interval = interval
+        self._due_at = 0
+
+    def on_begin(self, indicator):
+        if self.interval is None:
+            self._interval = indicator._update_interval
+        else:
+            self._interval = self.interval
+
+    def on_update(self, time_, iterations, value):
+        self._due_at = time_ + self._interval
+
+    def is_due(self, time_, iterations, value):
+        return time_ >= self._due_at
+
+
+class MaxFPS(MinInterval):
+    """Policy which is due at most `fps` times per second.
+
+    Parameters
+    ----------
+    fps : float
+        Maximum number of updates per second.
+    """
+    def __init__(self, fps):
+        MinInterval.__init__(self, 1 / fps)
+
+
+class MinValueDelta(UpdatePolicy):
+    """Policy which is due once the published value has grown by `delta`
+    since the last update, or if a value is published after an update
+    without one. It is never due if no value is published.
+
+    Parameters
+    ----------
+    delta : float
+        Minimum change of value between two updates.
+
+    relative : bool, optional
+        Whether `delta` is a fraction of the range between `min_value` and
+        `max_value` of the indicator (Default False).
+    """
+    def __init__(self, delta, relative=False):
+        self.delta = delta
+        self.relative = relative
+        self._indicator = None
+        self._due_at = -_INF
+
+    def on_begin(self, indicator):
+        self._indicator = indicator
+        self._due_at = -_INF
+
+    def on_update(self, time_, iterations, value):
+        delta = self.delta
+        if self.relative:
+            delta *= self._indicator.max_value - self._indicator.min_value
+        try:
+            self._due_at = value + delta
+        except TypeError:
+            self._due_at = -_INF
+
+    def is_due(self, time_, iterations, value):
+        try:
+            return value >= self._due_at
+        except TypeError:
+            return False
+
+
+class MinIterationDelta(UpdatePolicy):
+    """Policy which is due once `publish` has been called `n` times since
+    the last update.
+
+    Parameters
+    ----------
+    n : int
+        Minimum number of calls to publish between two updates.
+    """
+    def __init__(self, n):
+        self.n = n
+        self._due_at = 0
+
+    def on_update(self, time_, iterations, value):
+        self._due_at = iterations + self.n
+
+    def is_due(self, time_, iterations, value):
+        return iterations >= self._due_at
+
+
+class AnyOf(UpdatePolicy):
+    """Policy which is due if any of `policies` is due. Policies are
+    consulted in order and the first one which is due short-circuits the
+    others, so the cheapest or most often due policy should come first.
+    """
+    def __init__(self, *policies):
+        self.policies = policies
+        self._checks = tuple(policy.is_due for policy in policies)
+
+    def on_begin(self, indicator):
+        for policy in self.policies:
+            policy.on_begin(indicator)
+
+    def on_update(self, time_, iterations, value):
+        for policy in self.policies:
+            policy.on_update(time_, iterations, value)
+
+    def is_due(self, time_, iterations, value):
+        for is_due in self._checks:
+            if is_due(time_, iterations, value):
+                return True
+        return False
+
+
+class AllOf(AnyOf):
+    """Policy which is due if all of `policies` are due. Policies are
+    consulted in order and the first one which is not due short-circuits
+    the others, so the most selective policy should come first.
+    """
+    def is_due(self, time_, iterations, value):
+        for is_due in self._checks:
+            if not is_due(time_, iterations, value):
+                return False
+        return True
+
+
+def default_policy():
+    """Create the policy used by indicators without an `update_policy`.
+
+    The Progress Bar is updated once the update interval of the indicator
+    has passed, or if the value has grown by a tenth of its range.
+    """
+    return MinInterval() | MinValueDelta(0.1, relative=True)
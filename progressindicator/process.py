@@ -0,0 +1,143 @@
+"""This module contains a utility to display the progress of an external
+program, e.g. ffmpeg or rsync, from the progress it prints.
+
+The output of the program is read in chunks as it is produced and is never
+kept in memory. Only the latest progress printed in each chunk is used, so
+the parser keeps up with programs printing thousands of lines per second.
+"""
+from __future__ import division
+import os
+import select
+import subprocess
+
+_MAX_TAIL = 65536
+
+
+def _get_progress(match):
+    groups = match.groupdict()
+    if 'value' in groups:
+        total = groups.get('total')
+        return float(groups['value']), None if total is None else float(total)
+    return float(match.group(1) if match.re.groups else match.group(0)), None
+
+
+def run_process(indicator, args, pattern=None, parser=None, source='stderr',
+                encoding='utf-8', chunk_size=65536, **kwargs):
+    """Run a program and display its progress with `indicator`.
+
+    Progress is extracted from the output of the program either by `pattern`
+    or by `parser`. Output is read in chunks as soon as it is available, and
+    only the latest progress in each chunk is published. If the program
+    prints nothing for a while, time based stats are still refreshed.
+
+    The indicator is begun once the program is started. It is ended if the
+    program exits with status 0, else it is redrawn with the last progress
+    and reset.
+
+    Parameters
+    ----------
+    indicator : ProgressIndicator
+        The indicator used to display progress. Set its `max_value` to the
+        total printed by the program beforehand, if it is known.
+
+    args : str or sequence
+        Program and arguments, as for `subprocess.Popen`.
+
+    pattern : compiled regular expression, optional
+        Pattern matching the progress in the output. The value is taken
+        from the group named ``value`` if any, else the first group, else
+        the whole match. A group named ``total`` updates `max_value`. A
+        bytes pattern is matched against the raw output, which avoids
+        decoding it.
+
+    parser : callable, optional
+        Called with lines of output, latest first, until it returns a value
+        other than None, which is published. Used if `pattern` is None.
+
+    source : {'stderr', 'stdout'}, optional
+        Output of the program which is parsed. The other one is inherited
+        (Default 'stderr').
+
+    encoding : str, optional
+        Encoding of the output, used unless `pattern` is a bytes pattern
+        (Default 'utf-8').
+
+    chunk_size : int, optional
+        Maximum number of bytes read at once (Default 65536).
+
+    **kwargs
+        Passed on to `subprocess.Popen`.
+
+    Returns
+    -------
+    int:
+        Exit status of the program.
+    """
+    if (pattern is None) == (parser is None):
+        raise ValueError("exactly one of 'pattern' and 'parser' must be given")
+    if source not in ('stderr', 'stdout'):
+        raise ValueError("'source' must be 'stderr' or 'stdout', not {!r}".format(source))
+    is_binary = pattern is not None and isinstance(pattern.pattern, bytes)
+
+    def parse(block):
+        if not is_binary:
+            block = block.decode(encoding, 'replace')
+        if pattern is not None:
+            match = None
+            for match in pattern.finditer(block):
+                pass
+            return None if match is None else _get_progress(match)
+        for line in reversed(block.splitlines()):
+            value = parser(line)
+            if value is not None:
+                return value, None
+        return None
+
+    def publish(progress):
+        value, total = progress
+        if total is not None and total >= value:
+            indicator.set_max_value(total)
+        elif value > indicator.max_value:
+            indicator.set_max_value(value)
+        indicator.publish(value)
+
+    kwargs[source] = subprocess.PIPE
+    process = subprocess.Popen(args, **kwargs)
+    pipe = getattr(process, source)
+    fd = pipe.fileno()
+    # Pipes can only be polled on POSIX, elsewhere reads block until the
+    # program prints something.
+    can_poll = os.name == 'posix'
+    try:
+        indicator.begin()
+        tail = b''
+        while True:
+            if can_poll and not select.select([fd], [], [], indicator.max_update_interval)[0]:
+                indicator.refresh()
+                continue
+            data = os.read(fd, chunk_size)
+            if not data:
+                break
+            data = tail + data
+            # Incomplete lines are parsed along with the next chunk.
+            index = max(data.rfind(b'\n'), data.rfind(b'\r')) + 1
+            tail = data[index:][-_MAX_TAIL:]
+            progress = parse(data[:index])
+            if progress is not None:
+                publish(progress)
+        pipe.close()
+        returncode = process.wait()
+        if tail:
+            progress = parse(tail)
+            if progress is not None:
+                publish(progress)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    if returncode == 0:
+        indicator.end()
+    else:
+        indicator.refresh()
+        indicator.reset()
+    return returncode
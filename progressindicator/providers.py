@@ -1,13 +1,16 @@
 from __future__ import division
-import time
+import math
+import threading
 from .base import BaseProvider
 from .tags import *
 
+_INF = float('inf')
+
 
 class ETAProvider(BaseProvider):
-    """Default Provider for an estimate of the time remaining for the
-    completion of the task underway. The tag for this provider is `eta`.
-    This provider is used by the built-in `ETA` extension.
+    """Provider for an estimate of the time remaining for the completion of
+    the task underway. The tag for this provider is `eta`. By default, this
+    tag is provided by `RateETAProvider`.
     """
     def __init__(self):
         BaseProvider.__init__(self,
@@ -23,50 +26,542 @@ class ETAProvider(BaseProvider):
             pass
 
 
+def _get_eta1(time_, percentage, time_prev, percentage_prev):
+    # Time left at the speed of progress since the previous update, so
+    # items which take longer to process, e.g. weighted by their size, are
+    # accounted for. None if no progress was made.
+    if percentage > percentage_prev:
+        return (100 - percentage) * (time_ - time_prev) / (percentage - percentage_prev)
+    return None
+
+
 class ETA1Provider(BaseProvider):
-    """Default Provider for an alternate estimate of the time remaining for the
-    completion of the task underway. The tag for this provider is `eta_new`.
-    This provider is used by the built-in `ETANew` extension.
+    """Provider for an alternate estimate of the time remaining for the
+    completion of the task underway, based on the progress made since the
+    previous update rather than since the beginning. The estimate is kept
+    while no progress is made. The tag for this provider is `eta1`. By
+    default, this tag is provided by `RateETAProvider`.
     """
     def __init__(self):
         BaseProvider.__init__(self,
                               tag=TAG_ETA1,
-                              requirements=[TAG_ITERATIONS,
-                                            TAG_PERCENTAGE,
-                                            TAG_RATE])
+                              requirements=[TAG_TIME_SINCE_BEGIN,
+                                            TAG_PERCENTAGE])
+
+    def on_begin(self, params):
+        self.time_prev = 0
+        self.percentage_prev = 0
+        self.set_value(None)
 
     def on_validated(self, params):
-        try:
-            expected_left_iterations = (params[0]
-                                        * (100 - params[1])
-                                        / params[1])
-            eta_new = expected_left_iterations / params[2]
-            self.set_value(eta_new)
-        except ZeroDivisionError:
-            pass
+        time_, percentage = params
+        eta1 = _get_eta1(time_, percentage, self.time_prev, self.percentage_prev)
+        if eta1 is not None:
+            self.set_value(eta1)
+        self.time_prev, self.percentage_prev = time_, percentage
 
 
 class RateProvider(BaseProvider):
-    """Default Provider for the rate at which calls to `publish` are made.
-    The tag for this provider is `rate`. This provider is used by the
-    built-in `Rate` extension.
+    """Provider for the rate at which calls to `publish` are made. The tag
+    for this provider is `rate`. By default, this tag is provided by
+    `RateETAProvider`.
     """
     def __init__(self):
         BaseProvider.__init__(self,
                               tag=TAG_RATE,
-                              requirements=[TAG_ITERATIONS])
+                              requirements=[TAG_ITERATIONS,
+                                            TAG_TIME_SINCE_BEGIN])
 
     def on_begin(self, params):
-        self.time_prev = time.time()
+        self.time_prev = 0
         self.value_prev = 0
         self.set_value(0)
 
     def on_validated(self, params):
-        value = params[0]
-        time_ = time.time()
+        value, time_ = params
         try:
             rate = (value - self.value_prev) / (time_ - self.time_prev)
         except ZeroDivisionError:
             rate = 0
         self.set_value(rate)
         self.value_prev, self.time_prev = value, time_
+
+
+class RateETAProvider(BaseProvider):
+    """Default Provider for the rate at which calls to `publish` are made
+    and the estimates of the time remaining based on it. The tags for this
+    provider are `rate`, `eta` and `eta1`, which are used by the built-in
+    `Rate`, `ETA` and `ETA1` extensions.
+
+    Each tag is computed as by `RateProvider`, `ETAProvider` and
+    `ETA1Provider`, in a single update. Each tag is invalid on its own, so
+    the rate is known even if the percentage is not.
+    """
+    def __init__(self):
+        BaseProvider.__init__(self,
+                              tag=(TAG_RATE, TAG_ETA, TAG_ETA1),
+                              requirements=[TAG_ITERATIONS,
+                                            TAG_TIME_SINCE_BEGIN,
+                                            TAG_PERCENTAGE])
+
+    def on_begin(self, params):
+        self.time_prev = 0
+        self.value_prev = 0
+        self.percentage_prev = 0
+        self.set_value((0, None, None))
+
+    def on_update(self, params):
+        iterations, time_, percentage = params
+        _, eta, eta1 = self.get_value()
+        if iterations is None or time_ is None:
+            rate = None
+        else:
+            try:
+                rate = (iterations - self.value_prev) / (time_ - self.time_prev)
+            except ZeroDivisionError:
+                rate = 0
+            self.value_prev = iterations
+        if percentage is None or time_ is None:
+            eta = eta1 = None
+        else:
+            # Estimates are kept while no progress is made.
+            try:
+                eta = time_ * (100 - percentage) / percentage
+            except ZeroDivisionError:
+                pass
+            eta1_new = _get_eta1(time_, percentage, self.time_prev,
+                                 self.percentage_prev)
+            if eta1_new is not None:
+                eta1 = eta1_new
+            self.percentage_prev = percentage
+        if time_ is not None:
+            self.time_prev = time_
+        self.set_value((rate, eta, eta1))
+
+
+class LatencyHistogram(object):
+    """Constant memory streaming histogram of durations.
+
+    Durations are counted in logarithmically sized buckets, so quantiles are
+    estimated with a relative error of at most `accuracy`. Durations outside
+    [`min_duration`, `max_duration`] are clamped to the nearest bucket.
+
+    Parameters
+    ----------
+    accuracy : float, optional
+        Maximum relative error of estimated quantiles (Default 0.02).
+
+    min_duration : float, optional
+        Smallest duration(sec) which can be distinguished (Default 1e-6).
+
+    max_duration : float, optional
+        Largest duration(sec) which can be distinguished (Default 1e5).
+    """
+    def __init__(self, accuracy=0.02, min_duration=1e-6, max_duration=1e5):
+        gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(gamma)
+        self._gamma = gamma
+        self._offset = int(math.floor(math.log(min_duration) / self._log_gamma))
+        self._min_duration = min_duration
+        size = int(math.ceil(math.log(max_duration) / self._log_gamma)) - self._offset + 1
+        self._counts = [0] * size
+        self._last_index = size - 1
+        self.count = 0
+
+    def add(self, duration):
+        """Count one occurrence of `duration`."""
+        if duration < self._min_duration:
+            index = 0
+        else:
+            index = int(math.log(duration) / self._log_gamma - self._offset)
+            if index > self._last_index:
+                index = self._last_index
+        self._counts[index] += 1
+        self.count += 1
+
+    def clear(self):
+        """Remove all counted durations."""
+        self._counts = [0] * len(self._counts)
+        self.count = 0
+
+    def quantile(self, q):
+        """Estimate the `q` quantile of the counted durations.
+
+        Parameters
+        ----------
+        q : float
+            Quantile to estimate, between 0 and 1.
+
+        Returns
+        -------
+        float or None:
+            Estimated duration(sec), or None if nothing has been counted.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen > rank:
+                break
+        return self._get_bucket_value(index)
+
+    def quantiles(self, qs):
+        """Estimate several quantiles of the counted durations in a single
+        pass.
+
+        Parameters
+        ----------
+        qs : array_like
+            Quantiles to estimate, each between 0 and 1, in increasing
+            order.
+
+        Returns
+        -------
+        list:
+            Estimated durations(sec), or Nones if nothing has been counted.
+        """
+        if not self.count:
+            return [None] * len(qs)
+        ranks = [q * (self.count - 1) for q in qs]
+        result = []
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            while seen > ranks[len(result)]:
+                result.append(self._get_bucket_value(index))
+                if len(result) == len(ranks):
+                    return result
+        while len(result) < len(ranks):
+            result.append(self._get_bucket_value(index))
+        return result
+
+    def _get_bucket_value(self, index):
+        lower = self._gamma ** (index + self._offset)
+        return 2 * lower * self._gamma / (1 + self._gamma)
+
+
+class LatencyProvider(BaseProvider):
+    """Default Provider for the distribution of time between successive
+    calls to `publish`. The tags for this provider are `latency`, whose
+    value is a `LatencyHistogram`, and its quantiles `latency_p50`,
+    `latency_p95` and `latency_p99`, which are used by the built-in
+    `Latency` extension. The histogram is updated on every publish, while
+    the quantiles are estimated in a single pass on each update.
+    """
+    _quantiles = (0.50, 0.95, 0.99)
+
+    def __init__(self):
+        BaseProvider.__init__(self,
+                              tag=(TAG_LATENCY, TAG_LATENCY_P50,
+                                   TAG_LATENCY_P95, TAG_LATENCY_P99),
+                              requirements=[TAG_BEGIN_TIME])
+        self._histogram = LatencyHistogram()
+        self._time_prev = None
+
+    def on_begin(self, params):
+        self._histogram.clear()
+        self._time_prev = params[0]
+        self.on_validated(params)
+
+    def on_publish(self, time_, value, worker):
+        self._histogram.add(time_ - self._time_prev)
+        self._time_prev = time_
+
+    def on_validated(self, params):
+        self.set_value((self._histogram,)
+                       + tuple(self._histogram.quantiles(self._quantiles)))
+
+
+class QuantileProvider(BaseProvider):
+    """Provider for a quantile of the time between successive calls to
+    `publish`, estimated from the `latency` tag.
+
+    Parameters
+    ----------
+    tag : str
+        Tag of the provider.
+
+    quantile : float
+        Quantile to estimate, between 0 and 1.
+    """
+    def __init__(self, tag, quantile):
+        BaseProvider.__init__(self, tag=tag, requirements=[TAG_LATENCY])
+        self.quantile = quantile
+
+    def on_validated(self, params):
+        self.set_value(params[0].quantile(self.quantile))
+
+
+def _extrapolate(percentage, trend, z):
+    # Time left until 100 percent at the slope of `trend` shifted by `z`
+    # standard errors, or None if the task does not seem to progress. The
+    # bounds are None as well while the standard error is unknown.
+    if percentage >= 100:
+        return 0
+    slope, stderr = trend
+    if z:
+        if math.isinf(stderr):
+            return None
+        slope += z * stderr
+    if slope > 0:
+        return (100 - percentage) / slope
+    return None
+
+
+class TrendProvider(BaseProvider):
+    """Default Provider for the trend of the progress of the task underway.
+    The tags for this provider are `trend`, whose value is a tuple of the
+    slope(percent/sec) of the fitted trend and its standard error, or None
+    if too few points are known, and the estimates extrapolated from it
+    `eta_trend`, `eta_trend_low` and `eta_trend_high` (see
+    `TrendETAProvider`), which are used by the built-in `TrendETA`
+    extension.
+
+    A bounded history of (time, percentage) points is kept, sampled each
+    time the percentage has advanced by a minimum step. When the history is
+    full, every other point is dropped and the step is doubled, so the
+    history always spans the whole task. The trend is fitted by weighted
+    least squares, where the weight of a point halves for every `half_life`
+    percent of progress made since, so recent changes in speed dominate the
+    fit. If the range of values changes while the task is underway, the
+    history is rescaled to the new range.
+
+    Parameters
+    ----------
+    size : int, optional
+        Maximum number of points in the history (Default 64).
+
+    half_life : float, optional
+        Progress in percent after which the weight of a point is halved
+        (Default 5).
+    """
+    _zs = (0, 1.96, -1.96)
+
+    def __init__(self, size=64, half_life=5):
+        BaseProvider.__init__(self,
+                              tag=(TAG_TREND, TAG_ETA_TREND,
+                                   TAG_ETA_TREND_LOW, TAG_ETA_TREND_HIGH),
+                              requirements=[TAG_TIME_SINCE_BEGIN,
+                                            TAG_PERCENTAGE,
+                                            TAG_MIN_VALUE,
+                                            TAG_MAX_VALUE])
+        self.size = size
+        self.half_life = half_life
+
+    def on_begin(self, params):
+        self._times = [0]
+        self._percentages = [0]
+        self._step = 100 / self.size
+        self._range = params[3] - params[2]
+        self._trend = None
+        self.set_value(None)
+
+    def _rescale(self, time_, percentage, range_):
+        # Percentages of the history are relative to the previous range.
+        if 0 < self._range < _INF and 0 < range_ < _INF:
+            factor = self._range / range_
+            self._percentages = [p * factor for p in self._percentages]
+        else:
+            self._times = [time_]
+            self._percentages = [percentage]
+        self._range = range_
+
+    def _set_trend(self, percentage, trend):
+        self._trend = trend
+        if trend is None:
+            self.set_value(None)
+        else:
+            self.set_value((trend,) + tuple(_extrapolate(percentage, trend, z)
+                                            for z in self._zs))
+
+    def _add_point(self, time_, percentage):
+        if percentage - self._percentages[-1] < self._step:
+            return
+        self._times.append(time_)
+        self._percentages.append(percentage)
+        if len(self._times) >= self.size:
+            del self._times[1::2]
+            del self._percentages[1::2]
+            self._step *= 2
+
+    def _fit(self, time_, percentage):
+        times = self._times + [time_]
+        percentages = self._percentages + [percentage]
+        if len(times) < 3:
+            return None
+        decay = math.log(2) / self.half_life
+        weights = [math.exp(decay * (p - percentage)) for p in percentages]
+        w_sum = sum(weights)
+        t_mean = sum(w * t for w, t in zip(weights, times)) / w_sum
+        p_mean = sum(w * p for w, p in zip(weights, percentages)) / w_sum
+        s_tt = sum(w * (t - t_mean) ** 2 for w, t in zip(weights, times))
+        s_tp = sum(w * (t - t_mean) * (p - p_mean)
+                   for w, t, p in zip(weights, times, percentages))
+        if s_tt <= 0:
+            return None
+        slope = s_tp / s_tt
+        intercept = p_mean - slope * t_mean
+        s_rr = sum(w * (p - intercept - slope * t) ** 2
+                   for w, t, p in zip(weights, times, percentages))
+        # Effective number of points for the weighted residual variance.
+        n_eff = w_sum ** 2 / sum(w * w for w in weights)
+        if n_eff <= 2:
+            return (slope, float('inf'))
+        variance = s_rr / w_sum * n_eff / (n_eff - 2)
+        return (slope, math.sqrt(variance / s_tt))
+
+    def on_validated(self, params):
+        time_, percentage, min_value, max_value = params
+        if max_value - min_value != self._range:
+            self._rescale(time_, percentage, max_value - min_value)
+        self._set_trend(percentage, self._fit(time_, percentage))
+        self._add_point(time_, percentage)
+
+    def on_end(self, params):
+        # The trend fitted before the end is kept.
+        self._set_trend(100, self._trend)
+
+
+class TrendETAProvider(BaseProvider):
+    """Provider for an estimate of the time remaining for the completion of
+    the task underway, extrapolated from the `trend` tag. The value is None
+    if the task does not seem to progress. The default tags `eta_trend`,
+    `eta_trend_low` and `eta_trend_high` are provided by `TrendProvider`.
+
+    Parameters
+    ----------
+    tag : str
+        Tag of the provider.
+
+    z : float, optional
+        Number of standard errors added to the slope of the trend before
+        extrapolating. 0 gives the best estimate, 1.96 and -1.96 give the
+        bounds of the 95% confidence interval (Default 0).
+    """
+    def __init__(self, tag, z=0):
+        BaseProvider.__init__(self,
+                              tag=tag,
+                              requirements=[TAG_PERCENTAGE, TAG_TREND])
+        self.z = z
+
+    def on_validated(self, params):
+        percentage, trend = params
+        self.set_value(_extrapolate(percentage, trend, self.z))
+
+
+class WorkerProvider(BaseProvider):
+    """Default Provider for the progress of each worker publishing to the
+    indicator. The tags for this provider are `worker_rate`, a dict mapping
+    each worker to the rate at which it calls publish, and `worker_idle`, a
+    dict mapping each worker to the time since it last called publish. They
+    are used by the built-in `Stragglers` extension.
+
+    Workers are identified by the `worker` passed to publish, or else by the
+    identifier of the publishing thread, as thread names need not be
+    unique. Each worker takes constant memory.
+
+    Parameters
+    ----------
+    smoothing : float, optional
+        Weight of the latest measurement in the exponential moving average
+        of the rate of each worker, between 0 and 1 (Default 0.3).
+    """
+    def __init__(self, smoothing=0.3):
+        BaseProvider.__init__(self,
+                              tag=(TAG_WORKER_RATE, TAG_WORKER_IDLE),
+                              requirements=[TAG_BEGIN_TIME,
+                                            TAG_TIME_SINCE_BEGIN])
+        self.smoothing = smoothing
+        self._workers = {}
+
+    def on_begin(self, params):
+        # Maps workers to [calls, last publish time, calls at last update,
+        # rate at last update].
+        self._workers = {}
+        self._time_prev = params[0]
+        self.set_value(({}, {}))
+
+    def on_publish(self, time_, value, worker):
+        if worker is None:
+            worker = threading.current_thread().ident
+        try:
+            state = self._workers[worker]
+        except KeyError:
+            state = self._workers[worker] = [0, time_, 0, None]
+        state[0] += 1
+        state[1] = time_
+
+    def on_validated(self, params):
+        time_ = params[0] + params[1]
+        delta_time = time_ - self._time_prev
+        rates = {}
+        idle = {}
+        # Copied as publish may add workers from other threads meanwhile.
+        for worker, state in list(self._workers.items()):
+            calls = state[0]
+            if delta_time > 0:
+                rate = (calls - state[2]) / delta_time
+                if state[3] is not None:
+                    rate = state[3] + self.smoothing * (rate - state[3])
+                state[2] = calls
+                state[3] = rate
+            rates[worker] = state[3]
+            idle[worker] = max(0, time_ - state[1])
+        if delta_time > 0:
+            self._time_prev = time_
+        self.set_value((rates, idle))
+
+
+class ThroughputProvider(BaseProvider):
+    """Default Provider for the amount of progress made per second, as
+    opposed to the number of calls to `publish` per second given by the
+    `rate` tag. The tag for this provider is `throughput`, which is used by
+    the built-in `Throughput` extension.
+
+    While the task is underway, it is an exponential moving average of the
+    throughput between updates. Once the task has ended, it is the average
+    throughput of the whole task.
+
+    Parameters
+    ----------
+    smoothing : float, optional
+        Weight of the latest measurement in the exponential moving average,
+        between 0 and 1 (Default 0.3).
+    """
+    def __init__(self, smoothing=0.3):
+        BaseProvider.__init__(self,
+                              tag=TAG_THROUGHPUT,
+                              requirements=[TAG_VALUE,
+                                            TAG_MIN_VALUE,
+                                            TAG_TIME_SINCE_BEGIN])
+        self.smoothing = smoothing
+
+    def on_begin(self, params):
+        self.value_prev = None
+        self.time_prev = 0
+        self.set_value(None)
+
+    def on_validated(self, params):
+        value, min_value, time_ = params
+        if self.value_prev is None:
+            self.value_prev = min_value
+        if time_ <= self.time_prev:
+            return
+        throughput = (value - self.value_prev) / (time_ - self.time_prev)
+        throughput_prev = self.get_value()
+        if throughput_prev is not None:
+            throughput = throughput_prev + self.smoothing * (throughput - throughput_prev)
+        self.value_prev, self.time_prev = value, time_
+        self.set_value(throughput)
+
+    def on_invalidated(self, params):
+        pass
+
+    def on_end(self, params):
+        value, min_value, time_ = params
+        try:
+            self.set_value((value - min_value) / time_)
+        except (TypeError, ZeroDivisionError):
+            pass
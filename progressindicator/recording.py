@@ -0,0 +1,218 @@
+"""This module contains utilities to record the publish timeline of a
+ProgressIndicator and to replay it later for offline analysis.
+
+A recording is a compact binary append-only file. Each call to `begin`,
+`publish`, `set_max_value` and `end` of an indicator with a `Recorder`
+attached appends one fixed-size record to an in-memory buffer which is
+written to disk in large blocks, so the cost per publish is a single
+`struct.pack`.
+"""
+from __future__ import division
+import math
+import struct
+
+_MAGIC = b'PIREC\x01'
+
+_KIND_BEGIN = b'B'
+_KIND_PUBLISH = b'P'
+_KIND_END = b'E'
+_KIND_MAX_VALUE = b'M'
+
+# kind, timestamp, min_value, max_value
+_BEGIN = struct.Struct('<cddd')
+# kind, timestamp, value, iterations
+_PUBLISH = struct.Struct('<cddQ')
+# kind, timestamp
+_END = struct.Struct('<cd')
+# kind, timestamp, max_value
+_MAX_VALUE = struct.Struct('<cdd')
+
+_STRUCTS = {_KIND_BEGIN: _BEGIN, _KIND_PUBLISH: _PUBLISH, _KIND_END: _END,
+            _KIND_MAX_VALUE: _MAX_VALUE}
+
+_NAN = float('nan')
+
+
+class Recorder(object):
+    """Logs the publish timeline of a ProgressIndicator to a binary file.
+
+    Assign an instance to the `recorder` attribute of a `ProgressIndicator`
+    before calling `begin`. Records are appended to `path`, so several runs
+    can be recorded into the same file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file records are appended to.
+
+    buffer_size : int, optional
+        Number of bytes buffered in memory before they are written to the
+        file (Default 65536).
+    """
+    def __init__(self, path, buffer_size=65536):
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+        self._buffer = bytearray()
+        self.buffer_size = buffer_size
+
+    def _append(self, data):
+        buffer_ = self._buffer
+        buffer_ += data
+        if len(buffer_) >= self.buffer_size:
+            self.flush()
+
+    def on_begin(self, time_, min_value, max_value):
+        """Record a call to `begin`."""
+        self._append(_BEGIN.pack(_KIND_BEGIN, time_, min_value, max_value))
+
+    def on_publish(self, time_, value, iterations):
+        """Record a call to `publish`."""
+        if value is None:
+            value = _NAN
+        self._append(_PUBLISH.pack(_KIND_PUBLISH, time_, value, iterations))
+
+    def on_max_value(self, time_, max_value):
+        """Record a call to `set_max_value`."""
+        self._append(_MAX_VALUE.pack(_KIND_MAX_VALUE, time_, max_value))
+
+    def on_end(self, time_):
+        """Record a call to `end` and flush the buffer."""
+        self._append(_END.pack(_KIND_END, time_))
+        self.flush()
+
+    def flush(self):
+        """Write all buffered records to the file."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.flush()
+
+    def close(self):
+        """Flush buffered records and close the file."""
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class VirtualClock(object):
+    """A clock whose time only changes when it is explicitly set.
+
+    An instance can be assigned to the `clock` attribute of a
+    `ProgressIndicator`.
+
+    Parameters
+    ----------
+    time : float, optional
+        Initial time of the clock (Default 0).
+    """
+    def __init__(self, time=0.0):
+        self.time = time
+
+    def __call__(self):
+        return self.time
+
+
+def read_records(path, block_size=1 << 20):
+    """Iterate over the records of a recording.
+
+    The file is read in blocks of `block_size` bytes, so memory use does not
+    depend on the length of the recording.
+
+    Parameters
+    ----------
+    path : str
+        Path of a file written by a `Recorder`.
+
+    block_size : int, optional
+        Number of bytes read at once (Default 1 MiB).
+
+    Yields
+    ------
+    tuple
+        ``('begin', time, min_value, max_value)``,
+        ``('publish', time, value, iterations)``,
+        ``('max_value', time, max_value)`` or ``('end', time)``.
+        `value` is None if `publish` was called without a value.
+    """
+    with open(path, 'rb') as file_:
+        if file_.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(
+                "{} is not a progressindicator recording".format(path))
+        # Offset in the file of the start of data.
+        position = len(_MAGIC)
+        data = b''
+        offset = 0
+        while True:
+            block = file_.read(block_size)
+            if not block:
+                # Anything left is a truncated trailing record, e.g. if the
+                # process was killed.
+                return
+            position += offset
+            data = data[offset:] + block
+            offset = 0
+            size = len(data)
+            while offset < size:
+                kind = data[offset:offset + 1]
+                try:
+                    record = _STRUCTS[kind]
+                except KeyError:
+                    raise ValueError("corrupt record at offset {}".format(
+                        position + offset))
+                if offset + record.size > size:
+                    # The record is completed by the next block.
+                    break
+                fields = record.unpack_from(data, offset)
+                offset += record.size
+                if kind == _KIND_PUBLISH:
+                    value = fields[2]
+                    if math.isnan(value):
+                        value = None
+                    yield ('publish', fields[1], value, fields[3])
+                elif kind == _KIND_BEGIN:
+                    yield ('begin',) + fields[1:]
+                elif kind == _KIND_MAX_VALUE:
+                    yield ('max_value', fields[1], fields[2])
+                else:
+                    yield ('end', fields[1])
+
+
+def replay(path, indicator):
+    """Drive `indicator` from a recording at full speed.
+
+    The indicator's clock is replaced by a `VirtualClock` which is advanced
+    to the timestamp of each record before it is replayed, so all time based
+    stats match the recorded run. The original clock is restored afterwards.
+
+    Parameters
+    ----------
+    path : str
+        Path of a file written by a `Recorder`.
+
+    indicator : ProgressIndicator
+        The indicator to drive. Each recorded run is replayed in turn.
+    """
+    clock = VirtualClock()
+    original_clock = indicator.clock
+    indicator.clock = clock
+    try:
+        for record in read_records(path):
+            clock.time = record[1]
+            if record[0] == 'publish':
+                indicator.publish(record[2])
+            elif record[0] == 'max_value':
+                indicator.set_max_value(record[2])
+            elif record[0] == 'begin':
+                indicator.min_value = record[2]
+                indicator.max_value = record[3]
+                indicator.begin()
+            else:
+                indicator.end()
+    finally:
+        indicator.clock = original_clock
@@ -0,0 +1,301 @@
+"""This module contains a registry to track the progress of a large number of
+concurrent tasks, and a board to draw a summary of them.
+
+A `ProgressIndicator` per task is too heavy when tracking many thousands of
+tasks. A `TaskRegistry` stores the state of each task in a few arrays
+instead, 41 bytes per task plus an entry in a dict for named tasks, and
+updating a task costs a few array writes. A `TaskBoard` draws the aggregate progress of all tasks and
+the lines of only a few selected tasks, e.g. the least complete ones.
+"""
+from __future__ import division
+import array
+import heapq
+import itertools
+import operator
+import sys
+import time
+from .core import ProgressIndicator
+from .extensions import Percentage, Bar, ETA
+from .terminal import BlockWriter
+
+
+class TaskRegistry(object):
+    """Stores the progress of many tasks in compact arrays.
+
+    Tasks are identified by the integer returned by `add`. Identifiers of
+    removed tasks are reused by later tasks.
+
+    Parameters
+    ----------
+    clock : callable, optional
+        Function returning the current time in seconds (Default time.time).
+
+    smoothing : float, optional
+        Weight of the latest measurement in the exponential moving average
+        of the rate of each task, between 0 and 1 (Default 0.3).
+    """
+    def __init__(self, clock=time.time, smoothing=0.3):
+        self.clock = clock
+        self.smoothing = smoothing
+        self.values = array.array('d')
+        self.totals = array.array('d')
+        self.begin_times = array.array('d')
+        self.update_times = array.array('d')
+        self.rates = array.array('d')
+        self._active = bytearray()
+        self._free = []
+        self._names = {}
+        self.value_sum = 0
+        self.total_sum = 0
+
+    def __len__(self):
+        return len(self._active) - len(self._free)
+
+    def add(self, total, name=None):
+        """Start tracking a task.
+
+        Parameters
+        ----------
+        total : float
+            Value at which the task is complete.
+
+        name : str, optional
+            Name of the task, used when it is drawn.
+
+        Returns
+        -------
+        int:
+            Identifier of the task.
+        """
+        time_ = self.clock()
+        if self._free:
+            task = self._free.pop()
+            self.values[task] = 0
+            self.totals[task] = total
+            self.begin_times[task] = time_
+            self.update_times[task] = time_
+            self.rates[task] = 0
+            self._active[task] = 1
+        else:
+            task = len(self._active)
+            self.values.append(0)
+            self.totals.append(total)
+            self.begin_times.append(time_)
+            self.update_times.append(time_)
+            self.rates.append(0)
+            self._active.append(1)
+        if name is not None:
+            self._names[task] = name
+        self.total_sum += total
+        return task
+
+    def update(self, task, value):
+        """Set the progress of a task.
+
+        Parameters
+        ----------
+        task : int
+            Identifier of the task.
+
+        value : float
+            Current progress of the task, clamped to its total.
+        """
+        if not self._active[task]:
+            raise KeyError(task)
+        total = self.totals[task]
+        if value > total:
+            value = total
+        time_ = self.clock()
+        delta_time = time_ - self.update_times[task]
+        prev_value = self.values[task]
+        if delta_time > 0:
+            rate = (value - prev_value) / delta_time
+            self.rates[task] += self.smoothing * (rate - self.rates[task])
+            self.update_times[task] = time_
+        self.values[task] = value
+        self.value_sum += value - prev_value
+
+    def advance(self, task, delta=1):
+        """Add `delta` to the progress of a task."""
+        self.update(task, self.values[task] + delta)
+
+    def set_total(self, task, total):
+        """Change the value at which a task is complete."""
+        self.total_sum += total - self.totals[task]
+        self.totals[task] = total
+        if self.values[task] > total:
+            self.update(task, total)
+
+    def remove(self, task):
+        """Stop tracking a task.
+
+        Its progress is removed from the aggregate progress as well.
+        """
+        if not self._active[task]:
+            raise KeyError(task)
+        self._active[task] = 0
+        self.value_sum -= self.values[task]
+        self.total_sum -= self.totals[task]
+        self._names.pop(task, None)
+        self._free.append(task)
+
+    def get_name(self, task):
+        """Get the name of a task, 'Task <id>' if it has none."""
+        try:
+            return self._names[task]
+        except KeyError:
+            return "Task {}".format(task)
+
+    def get_percentage(self, task):
+        """Get the percentage of a task which is complete."""
+        try:
+            return 100 * self.values[task] / self.totals[task]
+        except ZeroDivisionError:
+            return 100
+
+    def tasks(self):
+        """Iterate over the identifiers of all tracked tasks."""
+        active = self._active
+        return (task for task in range(len(active)) if active[task])
+
+    def top(self, k, order='least_complete'):
+        """Select the first `k` tasks in a given order.
+
+        Parameters
+        ----------
+        k : int
+            Maximum number of tasks selected.
+
+        order : {'least_complete', 'slowest', 'most_recent', 'oldest'}, optional
+            'least_complete' selects tasks with the lowest percentage,
+            'slowest' those with the lowest rate, 'most_recent' the last
+            updated ones and 'oldest' the first added ones
+            (Default 'least_complete').
+
+        Returns
+        -------
+        list:
+            Identifiers of the selected tasks.
+        """
+        # Keys are computed for all tasks by iterators implemented in C,
+        # which matters with many thousands of tasks.
+        select = heapq.nsmallest
+        if order == 'least_complete':
+            if 0 in self.totals:
+                keys = [self.get_percentage(task) for task in range(len(self.totals))]
+            else:
+                keys = map(operator.truediv, self.values, self.totals)
+        elif order == 'slowest':
+            keys = self.rates
+        elif order == 'most_recent':
+            keys = self.update_times
+            select = heapq.nlargest
+        elif order == 'oldest':
+            keys = self.begin_times
+        else:
+            raise ValueError("unknown order {!r}".format(order))
+        pairs = itertools.compress(zip(keys, itertools.count()), self._active)
+        return [task for _, task in select(k, pairs)]
+
+
+class TaskBoard(object):
+    """Draws the aggregate progress of the tasks of a `TaskRegistry` and the
+    lines of up to `k` of them.
+
+    The aggregate progress is drawn by a `ProgressIndicator`, so its update
+    policy decides when the board is redrawn. The lines of tasks are only
+    built for the selected tasks, when the board is redrawn.
+
+    Parameters
+    ----------
+    registry : TaskRegistry
+        The tasks to draw.
+
+    k : int, optional
+        Maximum number of tasks drawn (Default 10).
+
+    order : str, optional
+        Order in which tasks are selected, see `TaskRegistry.top`
+        (Default 'least_complete').
+
+    indicator : ProgressIndicator, optional
+        Indicator of the aggregate progress. Default shows the percentage, a
+        bar and the ETA.
+
+    stream : file, optional
+        Stream to draw on (Default sys.stderr).
+
+    bar_length : int, optional
+        Number of entities in the bar of each task (Default 20).
+    """
+    def __init__(self, registry, k=10, order='least_complete', indicator=None,
+                 stream=sys.stderr, bar_length=20):
+        if indicator is None:
+            indicator = ProgressIndicator(components=["All", Percentage(),
+                                                      Bar(length=40),
+                                                      "ETA:", ETA()])
+        self.registry = registry
+        self.k = k
+        self.order = order
+        self.indicator = indicator
+        self.bar_length = bar_length
+        indicator.display = self
+        indicator.clear_on_task_completion = False
+        self._writer = BlockWriter(stream)
+
+    def begin(self):
+        """Begin drawing the board."""
+        self.indicator.min_value = 0
+        self.indicator.max_value = self.registry.total_sum
+        self.indicator.begin()
+
+    def update(self):
+        """Publish the aggregate progress, which redraws the board if the
+        update policy of the indicator is due."""
+        indicator = self.indicator
+        total_sum = self.registry.total_sum
+        # The sum of values is updated incrementally and may drift above
+        # the sum of totals by rounding errors.
+        value_sum = min(self.registry.value_sum, total_sum)
+        if total_sum >= indicator.max_value:
+            indicator.set_max_value(total_sum)
+            indicator.publish(value_sum)
+        else:
+            indicator.publish(value_sum)
+            indicator.set_max_value(total_sum)
+
+    def end(self):
+        """Draw the final state of the board, where the aggregate progress
+        is complete. It should be called once all tasks are complete."""
+        # Publishes the latest progress, which also sets the final total.
+        self.update()
+        self.indicator.end()
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end()
+
+    def on_frame(self, indicator):
+        self._writer.write(self._get_lines())
+
+    def write_above(self, text):
+        self._writer.write(self._get_lines(), above=text)
+
+    def _format_task(self, task):
+        registry = self.registry
+        percentage = registry.get_percentage(task)
+        filled = int(percentage * self.bar_length / 100)
+        return "{} {:3.0f}% [{}{}] {:.1f}/s".format(
+            registry.get_name(task), percentage, '#' * filled,
+            ' ' * (self.bar_length - filled), registry.rates[task])
+
+    def _get_lines(self):
+        lines = [self._format_task(task)
+                 for task in self.registry.top(self.k, self.order)]
+        frame = self.indicator.get_last_frame()
+        if frame is not None:
+            lines.append(frame)
+        return lines
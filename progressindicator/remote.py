@@ -0,0 +1,265 @@
+"""This module contains utilities to display the progress of tasks running in
+independent processes.
+
+Each process reports progress through a `ProgressReporter`, which sends
+compact datagrams over a Unix domain socket or a localhost UDP socket. A
+`ProgressServer` receives them and draws one Progress Bar per task.
+Reporters never block: datagrams which cannot be sent immediately, for
+example because no server is running, are dropped.
+"""
+from __future__ import division
+import errno
+import logging
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from .core import ProgressIndicator, _string_types
+from .extensions import Percentage, Bar, ETA
+from .terminal import BlockWriter
+
+_MAGIC = b'PI'
+# magic, number of records
+_HEADER = struct.Struct('<2sB')
+# task id, value, total
+_RECORD = struct.Struct('<Idd')
+_MAX_RECORDS = 64
+
+_logger = logging.getLogger(__name__)
+
+
+def _create_socket(address):
+    if isinstance(address, _string_types):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+
+class ProgressReporter(object):
+    """Sends the progress of tasks to a `ProgressServer`.
+
+    Reports are batched: only the latest report of each task is kept and all
+    pending reports are sent together at most every `min_interval` seconds,
+    or immediately when a task completes.
+
+    Parameters
+    ----------
+    address : str or tuple
+        Path of a Unix domain socket, or (host, port) of a UDP socket.
+
+    min_interval : float, optional
+        Minimum time(sec) between two sends (Default 0.1).
+    """
+    def __init__(self, address, min_interval=0.1):
+        self.address = address
+        self.min_interval = min_interval
+        self._socket = _create_socket(address)
+        self._socket.setblocking(False)
+        self._pending = {}
+        self._next_send_at = 0
+
+    def report(self, task_id, value, total):
+        """Report the progress of a task.
+
+        Parameters
+        ----------
+        task_id : int
+            Identifier of the task, between 0 and 2**32 - 1.
+
+        value : float
+            Current progress of the task, between 0 and `total`.
+
+        total : float
+            Value at which the task is complete.
+        """
+        self._pending[task_id] = (value, total)
+        if value >= total or time.time() >= self._next_send_at:
+            self.flush()
+
+    def flush(self):
+        """Send all pending reports."""
+        pending = list(self._pending.items())
+        self._pending.clear()
+        self._next_send_at = time.time() + self.min_interval
+        for start in range(0, len(pending), _MAX_RECORDS):
+            batch = pending[start:start + _MAX_RECORDS]
+            data = [_HEADER.pack(_MAGIC, len(batch))]
+            data.extend(_RECORD.pack(task_id, value, total)
+                        for task_id, (value, total) in batch)
+            try:
+                self._socket.sendto(b''.join(data), self.address)
+            except (socket.error, OSError):
+                # The server is absent or too slow, drop the reports.
+                pass
+
+    def close(self):
+        """Send all pending reports and close the socket."""
+        self.flush()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _default_factory(task_id):
+    return ProgressIndicator(components=["Task {}".format(task_id),
+                                         Percentage(), Bar(length=40),
+                                         "ETA:", ETA()])
+
+
+class ProgressServer(object):
+    """Receives reports from `ProgressReporter` instances and draws the
+    Progress Bar of every task together.
+
+    A `ProgressIndicator` is created for each task on its first report and
+    ended once it is complete. Indicators are drawn as a block of lines,
+    redrawn at most every `update_interval` seconds. The final line of a
+    complete task is written once above the block and its indicator is
+    dropped, so only the ids of complete tasks are kept.
+
+    Parameters
+    ----------
+    address : str or tuple, optional
+        Path of a Unix domain socket, or (host, port) of a UDP socket to
+        listen on. Port 0 picks a free port (Default ('127.0.0.1', 0)).
+
+    factory : callable, optional
+        Called with a task id to create the indicator of a new task.
+
+    stream : file, optional
+        Stream to draw on (Default sys.stderr).
+
+    update_interval : float, optional
+        Minimum time(sec) between two redraws (Default 0.2).
+    """
+    def __init__(self, address=('127.0.0.1', 0), factory=_default_factory,
+                 stream=sys.stderr, update_interval=0.2):
+        self._socket = _create_socket(address)
+        self._socket.bind(address)
+        self._socket.setblocking(False)
+        self.address = self._socket.getsockname()
+        self.factory = factory
+        self.update_interval = update_interval
+        self.indicators = {}
+        self._finished = set()
+        self._writer = BlockWriter(stream)
+        self._is_dirty = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def on_frame(self, indicator):
+        self._is_dirty = True
+
+    def write_above(self, text):
+        with self._lock:
+            self._writer.write(self._get_lines(), above=text)
+
+    def start(self):
+        """Start receiving reports in a daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError("ProgressServer is already running")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='progressindicator-server')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop receiving reports, draw the final state and close the
+        socket."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self._draw()
+        self._socket.close()
+        if isinstance(self.address, _string_types):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _receive(self):
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except (socket.error, OSError) as exc:
+                if exc.args and exc.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                # Keep serving the other reports.
+                _logger.warning("Failed to receive progress reports",
+                                exc_info=True)
+                return
+            if len(data) < _HEADER.size:
+                continue
+            magic, count = _HEADER.unpack_from(data)
+            if magic != _MAGIC or len(data) != _HEADER.size + count * _RECORD.size:
+                continue
+            for i in range(count):
+                self._update(*_RECORD.unpack_from(data, _HEADER.size + i * _RECORD.size))
+
+    def _update(self, task_id, value, total):
+        if task_id in self._finished:
+            # The task has already completed.
+            return
+        indicator = self.indicators.get(task_id)
+        if indicator is None:
+            indicator = self.factory(task_id)
+            indicator.display = self
+            indicator.clear_on_task_completion = False
+            indicator.min_value = 0
+            indicator.max_value = total
+            indicator.begin()
+            self.indicators[task_id] = indicator
+        elif not indicator._is_allowed_to_publish:
+            # The task has completed since the last redraw.
+            return
+        elif total != indicator.max_value:
+            try:
+                indicator.set_max_value(total)
+            except ValueError:
+                # The total is below the published progress.
+                return
+        value = max(0, min(value, total))
+        if value >= total:
+            indicator.end()
+        else:
+            indicator.publish(value)
+
+    def _get_lines(self):
+        return [self.indicators[task_id].get_last_frame()
+                for task_id in sorted(self.indicators)]
+
+    def _draw(self):
+        self._is_dirty = False
+        with self._lock:
+            finished_ids = [task_id for task_id in sorted(self.indicators)
+                            if not self.indicators[task_id]._is_allowed_to_publish]
+            above = ''.join(self.indicators.pop(task_id).get_last_frame() + '\n'
+                            for task_id in finished_ids)
+            self._finished.update(finished_ids)
+            self._writer.write(self._get_lines(), above=above)
+
+    def _run(self):
+        next_draw_at = 0
+        while not self._stop_event.is_set():
+            readable = select.select([self._socket], [], [], self.update_interval)[0]
+            if readable:
+                self._receive()
+            time_curr = time.time()
+            if self._is_dirty and time_curr >= next_draw_at:
+                self._draw()
+                next_draw_at = time_curr + self.update_interval
@@ -0,0 +1,234 @@
+"""This module contains a frame scheduler which draws the Progress Bars of all
+indicators of a process together on one terminal.
+
+Without it, each indicator draws its own frames, so many indicators with
+short update intervals can write to the terminal thousands of times per
+second. Indicators registered with a `FrameScheduler` are drawn as a block
+of lines, rewritten at most `max_fps` times per second with a single write,
+and each of them computes at most one frame per tick.
+
+Indicators can be registered one by one::
+
+    scheduler = get_scheduler()
+    bars = [AdvancedProgressBar() for _ in range(100)]
+    for bar in bars:
+        scheduler.register(bar)
+
+or all indicators of the process which begin without a display can be
+drawn by the same scheduler::
+
+    set_default_scheduler(get_scheduler())
+"""
+from __future__ import division
+import sys
+import threading
+from . import core
+from .policies import UpdatePolicy, AllOf
+from .terminal import BlockWriter
+
+
+class _Gate(UpdatePolicy):
+    # Allows an indicator to compute a frame only if it has been granted one
+    # for the current tick of the scheduler. It comes before the policy of
+    # the indicator, so it drives the scheduler from every call to publish.
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.is_granted = True
+
+    def on_begin(self, indicator):
+        self.is_granted = True
+
+    def on_update(self, time_, iterations, value):
+        self.is_granted = False
+
+    def is_due(self, time_, iterations, value):
+        scheduler = self.scheduler
+        if time_ >= scheduler._next_tick_at:
+            scheduler.tick(time_)
+        return self.is_granted
+
+
+class FrameScheduler(object):
+    """Draws the Progress Bars of several indicators together, with a global
+    limit on the number of writes per second.
+
+    Frames are coalesced into ticks. At each tick, the last frame of every
+    registered indicator is written as a block of lines in a single write,
+    and at most `budget` indicators are granted the right to compute one new
+    frame before the next tick. Grants are given in turn to all indicators,
+    so each of them is updated equally often whatever its publish rate.
+    Ticks happen when any registered indicator publishes or draws a frame.
+    A frame drawn between two ticks, e.g. by `end`, is written at the next
+    tick by a short-lived timer thread, unless an indicator ticks first.
+
+    Parameters
+    ----------
+    stream : file, optional
+        Stream to draw on (Default sys.stderr).
+
+    max_fps : float, optional
+        Maximum number of writes per second (Default 10).
+
+    budget : int or None, optional
+        Maximum number of indicators which compute a new frame per tick. If
+        None, all indicators may compute one frame per tick (Default None).
+    """
+    def __init__(self, stream=sys.stderr, max_fps=10, budget=None):
+        self.max_fps = max_fps
+        self.budget = budget
+        self.indicators = []
+        self._gates = []
+        self._policies = []
+        self._writer = BlockWriter(stream)
+        self._next_tick_at = 0
+        self._next_grant = 0
+        self._is_dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def register(self, indicator):
+        """Draw `indicator` with the scheduler.
+
+        The `display` and `update_policy` of `indicator` are replaced until
+        it is unregistered, so it should be registered before `begin`.
+
+        Parameters
+        ----------
+        indicator : ProgressIndicator
+            The indicator to draw.
+        """
+        with self._lock:
+            gate = _Gate(self)
+            self.indicators.append(indicator)
+            self._gates.append(gate)
+            self._policies.append(indicator.update_policy)
+            indicator.display = self
+            indicator.update_policy = AllOf(gate, indicator.update_policy)
+            self._is_dirty = True
+
+    def unregister(self, indicator):
+        """Stop drawing `indicator` and restore its display and policy.
+
+        Parameters
+        ----------
+        indicator : ProgressIndicator
+            A registered indicator.
+        """
+        with self._lock:
+            index = self.indicators.index(indicator)
+            del self.indicators[index]
+            del self._gates[index]
+            indicator.update_policy = self._policies.pop(index)
+            indicator.display = None
+            self._is_dirty = True
+
+    def on_frame(self, indicator):
+        self._is_dirty = True
+        time_ = indicator.clock()
+        if time_ >= self._next_tick_at:
+            self.tick(time_)
+        elif self._timer is None:
+            timer = threading.Timer(self._next_tick_at - time_, self._on_timer,
+                                    (indicator.clock,))
+            timer.daemon = True
+            self._timer = timer
+            timer.start()
+
+    def _on_timer(self, clock):
+        self._timer = None
+        if self._is_dirty:
+            self.tick(clock())
+
+    def write_above(self, text):
+        with self._lock:
+            self._writer.write(self._get_lines(), above=text)
+
+    def tick(self, time_):
+        """Draw the last frame of all indicators and grant new frames.
+
+        This is called automatically once the next tick is due, when a
+        registered indicator publishes or draws a frame.
+
+        Parameters
+        ----------
+        time_ : float
+            Current time.
+        """
+        with self._lock:
+            # A frame drawn while another thread was ticking is written now,
+            # but grants are only given once per tick.
+            if self._is_dirty:
+                self._is_dirty = False
+                self._writer.write(self._get_lines())
+            if time_ >= self._next_tick_at:
+                self._next_tick_at = time_ + 1 / self.max_fps
+                self._grant()
+
+    def _grant(self):
+        gates = self._gates
+        if self.budget is None or self.budget >= len(gates):
+            for gate in gates:
+                gate.is_granted = True
+            return
+        start = self._next_grant % len(gates)
+        for i in range(start, start + self.budget):
+            gates[i % len(gates)].is_granted = True
+        self._next_grant = start + self.budget
+
+    def _get_lines(self):
+        lines = []
+        for indicator in self.indicators:
+            frame = indicator.get_last_frame()
+            if frame is not None:
+                lines.append(frame)
+        return lines
+
+    def close(self):
+        """Draw the final frame of all indicators and unregister them."""
+        timer = self._timer
+        if timer is not None:
+            timer.cancel()
+        with self._lock:
+            self._is_dirty = False
+            self._writer.write(self._get_lines())
+        for indicator in list(self.indicators):
+            self.unregister(indicator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Get the process-wide `FrameScheduler`, drawing on `sys.stderr`.
+
+    Returns
+    -------
+    FrameScheduler:
+        The scheduler, created on the first call.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler()
+    return _scheduler
+
+
+def set_default_scheduler(scheduler):
+    """Draw all indicators which begin without a display with `scheduler`.
+
+    Such indicators are registered with `scheduler` when they begin, and
+    unregistered when they end, their final frame being written above the
+    block unless it is cleared.
+
+    Parameters
+    ----------
+    scheduler : FrameScheduler or None
+        The scheduler, e.g. from `get_scheduler`. If None, indicators which
+        begin from now on draw their own frames.
+    """
+    core._default_scheduler = scheduler
@@ -0,0 +1,182 @@
+"""This module contains a small HTTP server reporting the progress of all live
+indicators of the process, e.g. to check a headless batch job.
+
+The server runs on a daemon thread and only reads the state of indicators
+through `ProgressIndicator.snapshot` and `ProgressIndicator.get_last_frame`,
+so it never evaluates providers or takes a lock on the publishing thread.
+Responses are cached for `cache_interval` seconds, so high request rates
+cost a single encoding per interval.
+
+Two paths are served:
+
+``/`` or ``/status.json``
+    JSON list with one object per indicator, holding its ``id``, its last
+    drawn ``frame`` and its ``tags``. Tags whose value is not a number,
+    string or boolean are omitted, and non-finite numbers are null. The
+    frame is null for headless indicators, whose tags are still kept up to
+    date, see `ProgressIndicator.allow_to_print`.
+
+``/status.txt``
+    The last drawn frame of each indicator, one per line, or its percentage
+    and number of iterations if it is headless.
+"""
+from __future__ import division
+import json
+import math
+import os
+import threading
+import time
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import UnixStreamServer
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import UnixStreamServer
+from .core import live_indicators, _string_types
+from .tags import TAG_ITERATIONS, TAG_PERCENTAGE
+
+_JSON_TYPES = (bool, int, float, str)
+
+
+def _to_json_value(value):
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def _format_tags(tags):
+    # Stands in for the frame of headless indicators.
+    percentage = tags.get(TAG_PERCENTAGE)
+    return "{}% {} iterations".format(
+        '?' if percentage is None else int(percentage), tags[TAG_ITERATIONS])
+
+
+def _get_status(indicators):
+    status = []
+    for indicator in indicators:
+        tags = dict((tag, _to_json_value(value))
+                    for tag, value in indicator.snapshot().items()
+                    if value is None or isinstance(value, _JSON_TYPES))
+        status.append({'id': id(indicator),
+                       'frame': indicator.get_last_frame(),
+                       'tags': tags})
+    return status
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/status.json'):
+            body, content_type = self.server.status.get_json(), 'application/json'
+        elif path == '/status.txt':
+            body, content_type = self.server.status.get_text(), 'text/plain; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (IOError, OSError):
+            # The client has disconnected.
+            pass
+
+    def address_string(self):
+        # Unix domain sockets have no client address.
+        return str(self.client_address) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(UnixStreamServer):
+    def get_request(self):
+        request, _ = UnixStreamServer.get_request(self)
+        return request, ''
+
+
+class StatusServer(object):
+    """HTTP server reporting the progress of all live indicators.
+
+    Parameters
+    ----------
+    address : str or tuple, optional
+        Path of a Unix domain socket, or (host, port) of a TCP socket to
+        listen on. Port 0 picks a free port. Only bind to localhost unless
+        the progress of the process may be public
+        (Default ('127.0.0.1', 0)).
+
+    cache_interval : float, optional
+        Time(sec) during which a response is reused (Default 0.5).
+
+    indicators : callable, optional
+        Called without arguments to get the indicators to report
+        (Default `live_indicators`).
+    """
+    def __init__(self, address=('127.0.0.1', 0), cache_interval=0.5,
+                 indicators=live_indicators):
+        if isinstance(address, _string_types):
+            self._server = _UnixHTTPServer(address, _RequestHandler)
+        else:
+            self._server = HTTPServer(address, _RequestHandler)
+        self._server.status = self
+        self.address = self._server.server_address
+        self.cache_interval = cache_interval
+        self.indicators = indicators
+        self._cache = {}
+        self._thread = None
+
+    def _get_cached(self, name, encode):
+        time_curr = time.time()
+        try:
+            expires_at, body = self._cache[name]
+            if time_curr < expires_at:
+                return body
+        except KeyError:
+            pass
+        body = encode(_get_status(self.indicators())).encode('utf-8')
+        self._cache[name] = (time_curr + self.cache_interval, body)
+        return body
+
+    def get_json(self):
+        """Get the JSON status of all indicators, as bytes."""
+        return self._get_cached('json', json.dumps)
+
+    def get_text(self):
+        """Get the last drawn frame of all indicators, or a summary of
+        headless ones, as bytes."""
+        return self._get_cached('text', lambda status: ''.join(
+            (_format_tags(item['tags']) if item['frame'] is None else item['frame'])
+            + '\n' for item in status if item['frame'] is not None or item['tags']))
+
+    def start(self):
+        """Start serving requests in a daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError("StatusServer is already running")
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='progressindicator-status')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving requests and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if isinstance(self.address, _string_types):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
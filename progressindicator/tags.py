@@ -44,18 +44,79 @@
 
    Refers to the time(sec) since the Progress bar was last updated on screen.
 
+.. data:: TAG_STALLED
+
+   Refers to the time(sec) since progress was last made if a `Watchdog`
+   considers the task stalled, else None
+
+.. data:: TAG_HISTORY
+
+   Refers to the `History` of the progress if one is attached to the
+   indicator, else None
+
 .. data:: TAG_ETA
 
    Refers to the expected time(s) the task would need to complete
 
 .. data:: TAG_ETA1
 
-   Refers to an alternate implementation of expected time(s)
-   the task would need to complete
+   Refers to the expected time(s) the task would need to complete at the
+   speed of progress since the previous update
+
+.. data:: TAG_TREND
+
+   Refers to the fitted trend of the percentage over time as a tuple of the
+   slope(percent/sec) and its standard error
+
+.. data:: TAG_ETA_TREND
+
+   Refers to the expected time(s) the task would need to complete
+   extrapolated from the recent trend of progress
+
+.. data:: TAG_ETA_TREND_LOW
+
+   Refers to the lower bound of the 95% confidence interval of `eta_trend`
+
+.. data:: TAG_ETA_TREND_HIGH
+
+   Refers to the upper bound of the 95% confidence interval of `eta_trend`
 
 .. data:: TAG_RATE
 
    Refers to current rate of calls to publish
+
+.. data:: TAG_LATENCY
+
+   Refers to a histogram of the time(sec) between successive calls to publish
+
+.. data:: TAG_LATENCY_P50
+
+   Refers to the median time(sec) between successive calls to publish
+
+.. data:: TAG_LATENCY_P95
+
+   Refers to the 95th percentile of the time(sec) between successive calls
+   to publish
+
+.. data:: TAG_LATENCY_P99
+
+   Refers to the 99th percentile of the time(sec) between successive calls
+   to publish
+
+.. data:: TAG_WORKER_RATE
+
+   Refers to a dict mapping each worker publishing progress to the rate at
+   which it calls publish
+
+.. data:: TAG_WORKER_IDLE
+
+   Refers to a dict mapping each worker publishing progress to the time(sec)
+   since it last called publish
+
+.. data:: TAG_THROUGHPUT
+
+   Refers to the amount of progress per second, e.g. bytes per second when
+   the value is a number of bytes
 """
 # Tags for built-in stats
 
@@ -70,8 +131,21 @@ TAG_TIME_SINCE_BEGIN = 'time_since_begin'
 TAG_DELTATIME = 'deltatime'
 TAG_LAST_UPDATED_AT = 'last_updated_at'
 TAG_TIME_SINCE_UPDATE = 'time_since_update'
+TAG_STALLED = 'stalled'
+TAG_HISTORY = 'history'
 
 # Tags for built-in providers
 TAG_ETA = 'eta'
 TAG_ETA1 = 'eta1'
+TAG_TREND = 'trend'
+TAG_ETA_TREND = 'eta_trend'
+TAG_ETA_TREND_LOW = 'eta_trend_low'
+TAG_ETA_TREND_HIGH = 'eta_trend_high'
 TAG_RATE = 'rate'
+TAG_LATENCY = 'latency'
+TAG_LATENCY_P50 = 'latency_p50'
+TAG_LATENCY_P95 = 'latency_p95'
+TAG_LATENCY_P99 = 'latency_p99'
+TAG_WORKER_RATE = 'worker_rate'
+TAG_WORKER_IDLE = 'worker_idle'
+TAG_THROUGHPUT = 'throughput'
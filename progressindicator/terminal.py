@@ -0,0 +1,118 @@
+"""This module contains helpers to draw on a terminal."""
+
+# Moves the cursor to the beginning of the line n lines up.
+_CURSOR_UP = '\x1b[{}F'
+_CLEAR_LINE = '\x1b[K'
+_CLEAR_BELOW = '\x1b[J'
+
+# Widths of the non-ASCII strings measured so far. Extensions return few
+# distinct strings, so each of them is measured once.
+_widths = {}
+_MAX_WIDTHS = 4096
+
+
+def _is_ascii(text):
+    try:
+        text.encode('ascii')
+    except UnicodeError:
+        return False
+    return True
+
+
+# str.isascii is only available from Python 3.7.
+_is_ascii = getattr(str, 'isascii', _is_ascii)
+
+
+def _get_char_width(char):
+    # Only imported once a non-ASCII string is measured.
+    import unicodedata
+    if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+        return 0
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        return 2
+    return 1
+
+
+def get_width(text):
+    """Get the number of columns taken by `text` on a terminal.
+
+    Wide East Asian characters and emoji take two columns, and combining
+    marks and other zero-width characters, e.g. variation selectors, take
+    none. Sequences of emoji joined into one glyph are counted as separate
+    characters.
+
+    Parameters
+    ----------
+    text : str
+        Printable text, without line endings or escape sequences. On
+        Python 2, a str is decoded as UTF-8.
+
+    Returns
+    -------
+    int:
+        Width of `text` in columns.
+    """
+    if _is_ascii(text):
+        return len(text)
+    if isinstance(text, bytes):
+        # Python 2 str, assumed to be encoded in UTF-8.
+        text = text.decode('utf-8', 'replace')
+    try:
+        return _widths[text]
+    except KeyError:
+        pass
+    width = sum(_get_char_width(char) for char in text)
+    if len(_widths) >= _MAX_WIDTHS:
+        _widths.clear()
+    _widths[text] = width
+    return width
+
+
+class BlockWriter(object):
+    """Draws a block of lines and redraws it in place.
+
+    Each redraw is done with a single write to the stream using ANSI escape
+    sequences, so the stream should be a terminal supporting them.
+
+    Parameters
+    ----------
+    stream : file
+        The stream to draw on.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self._line_count = 0
+
+    def write(self, lines, above=''):
+        """Replace the previously drawn block with `lines`.
+
+        Parameters
+        ----------
+        lines : array_like
+            Lines of the block, without line endings.
+
+        above : str, optional
+            Text which is written in place of the previous block and stays
+            above the new block, e.g. log messages. It should end with a line
+            ending if not empty (Default '').
+        """
+        parts = []
+        if self._line_count:
+            parts.append(_CURSOR_UP.format(self._line_count))
+        if above:
+            parts.append(_CLEAR_BELOW)
+            parts.append(above)
+        for line in lines:
+            parts.append(line)
+            parts.append(_CLEAR_LINE + '\n')
+        parts.append(_CLEAR_BELOW)
+        self.stream.write(''.join(parts))
+        self.stream.flush()
+        self._line_count = len(lines)
+
+    def clear(self):
+        """Erase the previously drawn block."""
+        if self._line_count:
+            self.stream.write(_CURSOR_UP.format(self._line_count) + _CLEAR_BELOW)
+            self.stream.flush()
+            self._line_count = 0
@@ -0,0 +1,161 @@
+"""This module contains the Watchdog class which detects stalled tasks."""
+from __future__ import print_function
+from __future__ import division
+import sys
+import threading
+import traceback
+from .extensions import StallMarker
+from .tags import TAG_ITERATIONS, TAG_STALLED
+
+
+def dump_stacks(indicator, reason):
+    """Callback for `Watchdog` which prints the stack of every thread to
+    `sys.stderr`.
+    """
+    frames = sys._current_frames()
+    lines = ["\nTask stalled: {}\n".format(reason)]
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        if frame is not None:
+            lines.append("\nThread {!r}:\n".format(thread.name))
+            lines.extend(traceback.format_stack(frame))
+    sys.stderr.write(''.join(lines))
+    sys.stderr.flush()
+
+
+class Watchdog(object):
+    """Detects when a task monitored by a ProgressIndicator has stalled.
+
+    A background thread periodically checks the number of calls made to
+    `publish`. The task is considered stalled if `publish` has not been
+    called for `timeout` seconds or, if `min_rate` is set, if fewer than
+    `min_rate` calls per second were made during the last `timeout` seconds.
+    While stalled, the `stalled` tag is set, so a `StallMarker` extension can
+    display it. Providers and other extensions are only updated by the thread
+    publishing progress: the watchdog thread updates `StallMarker` extensions
+    and redraws the other components as they were last drawn, while holding
+    the lock the indicator takes to draw. As the thread only reads the
+    iteration count, `publish` does no extra work. Time is read from the
+    `clock` of the indicator.
+
+    Parameters
+    ----------
+    indicator : ProgressIndicator
+        The indicator to watch.
+
+    timeout : float, optional
+        Time(sec) without progress after which the task is considered stalled
+        (Default 10).
+
+    min_rate : float, optional
+        Minimum rate of calls to `publish` below which the task is considered
+        stalled (Default None).
+
+    callbacks : array_like, optional
+        Callables invoked as ``callback(indicator, reason)`` from the
+        watchdog thread once each time the task becomes stalled.
+
+    check_interval : float, optional
+        Time(sec) between two checks (Default ``min(timeout / 4, 1)``).
+    """
+    def __init__(self, indicator, timeout=10, min_rate=None, callbacks=(),
+                 check_interval=None):
+        self.indicator = indicator
+        self.timeout = timeout
+        self.min_rate = min_rate
+        self.callbacks = list(callbacks)
+        if check_interval is None:
+            check_interval = min(timeout / 4, 1)
+        self.check_interval = check_interval
+        self.is_stalled = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start watching the indicator in a daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError("Watchdog is already running")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='progressindicator-watchdog')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the indicator and clear the stall marker."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        if self.is_stalled:
+            self._set_stalled(None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _set_stalled(self, stalled_for):
+        self.is_stalled = stalled_for is not None
+        indicator = self.indicator
+        indicator._stats[TAG_STALLED] = stalled_for
+        # The lock keeps the owning thread from updating or clearing the
+        # Progress Bar meanwhile.
+        with indicator._frame_lock:
+            if not (indicator._is_allowed_to_publish
+                    and indicator._is_allowed_to_print):
+                return
+            for component in indicator.components:
+                if isinstance(component, StallMarker):
+                    component.on_update([stalled_for])
+            indicator._draw()
+
+    def _run(self):
+        indicator = self.indicator
+        iterations_prev = None
+        low_rate_reason = None
+        while not self._stop_event.wait(self.check_interval):
+            if not indicator._is_allowed_to_publish:
+                iterations_prev = None
+                continue
+            try:
+                time_curr = indicator.clock()
+                iterations = indicator._stats[TAG_ITERATIONS]
+                if iterations_prev is None or iterations < iterations_prev:
+                    # A new task has begun.
+                    window_time, window_iterations = time_curr, iterations
+                    progress_time = time_curr
+                    low_rate_reason = None
+                elif iterations != iterations_prev:
+                    progress_time = time_curr
+                iterations_prev = iterations
+
+                if time_curr - window_time >= self.timeout:
+                    rate = (iterations - window_iterations) / (time_curr - window_time)
+                    window_time, window_iterations = time_curr, iterations
+                    if self.min_rate is not None and rate < self.min_rate:
+                        low_rate_reason = "rate {:.2f} iters/s below {}".format(
+                            rate, self.min_rate)
+                    else:
+                        low_rate_reason = None
+
+                stalled_for = time_curr - progress_time
+                if stalled_for >= self.timeout:
+                    reason = "no progress for {:.1f}s".format(stalled_for)
+                else:
+                    reason = low_rate_reason
+
+                if reason is not None:
+                    was_stalled = self.is_stalled
+                    self._set_stalled(stalled_for)
+                    if not was_stalled:
+                        for callback in self.callbacks:
+                            callback(indicator, reason)
+                elif self.is_stalled:
+                    self._set_stalled(None)
+            except Exception:
+                # A failing callback or redraw must not stop monitoring.
+                traceback.print_exc()
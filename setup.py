@@ -12,6 +12,11 @@ setup(name='progressindicator',
       author='Priyam Singh',
       author_email='priyamsingh.22296@gmail.com',
       packages=['progressindicator'],
+      entry_points={
+          'console_scripts': [
+              'progressindicator = progressindicator.cli:main',
+          ],
+      },
       url='https://github.com/pri22296/progressindicator',
       download_url='https://github.com/pri22296/progressindicator/tarball/{}'.format(_version),
       license='MIT',
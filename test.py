@@ -1,13 +1,41 @@
 from progressindicator.core import (SimpleProgressBar, ProgressIndicator,
                                     display_progress)
 from progressindicator.extensions import (Percentage, Rate, ETA, ETA1, Bar,
-                                          BouncingBar, Timer, Spinner, Loader)
-from progressindicator.base import BaseExtension
+                                          BouncingBar, Timer, Spinner, Loader,
+                                          Latency, StallMarker, TrendETA,
+                                          Stragglers, Sparkline, Size,
+                                          Throughput)
+from progressindicator.base import BaseExtension, BaseProvider
+from progressindicator.providers import ETAProvider
+from progressindicator.recording import Recorder, replay, read_records, VirtualClock
+from progressindicator.history import History
+from progressindicator.process import run_process
+from progressindicator.cli import iter_copy
+from progressindicator.terminal import get_width
+from progressindicator.watchdog import Watchdog
+from progressindicator.policies import MaxFPS, MinIterationDelta
+from progressindicator.buffers import iter_chunks
+from progressindicator.remote import ProgressServer, ProgressReporter
+from progressindicator.handlers import ProgressLogHandler
+from progressindicator.scheduler import FrameScheduler, set_default_scheduler
+from progressindicator.registry import TaskRegistry, TaskBoard
+from progressindicator.status import StatusServer
 from progressindicator.tags import *
 
 import time
 import functools
 import sys
+import os
+import tempfile
+import logging
+import threading
+import json
+import re
+import subprocess
+try:
+    from urllib.request import urlopen
+except ImportError:
+    from urllib2 import urlopen
 
 if sys.version_info[:2] >= (3,3):
     import shutil
@@ -47,6 +75,74 @@ def test_iterator_wrapper(n):
         time.sleep(0.01)
     return n/100
 
+@test
+def test_estimated_total(n):
+    bar = SimpleProgressBar()
+    for _ in bar(generator(n), total=n//2):
+        time.sleep(0.01)
+    assert bar.max_value == n - 1
+    return n/100
+
+@test
+def test_dynamic_total(n):
+    bar = SimpleProgressBar()
+    bar.max_value = n//2
+    bar.begin()
+    for i in range(n):
+        if i == n//4:
+            # More work arrives while the task is underway.
+            bar.set_max_value(n)
+        time.sleep(0.01)
+        bar.publish(i+1)
+    bar.end()
+    return n/100
+
+@test
+def test_weighted_iterator(n):
+    sizes = [(i % 5 + 1) * 1000 for i in range(n)]
+    bar = ProgressIndicator(components=[Percentage(), Bar(), ETA(), ETA1()])
+    for size in bar(sizes, weight=sizes):
+        time.sleep(size / 1e6)
+    assert bar.max_value == sum(sizes)
+    try:
+        bar(sizes, weight=sizes[1:])
+    except ValueError:
+        pass
+    else:
+        assert False, "Weights of a different length were accepted"
+    # The weight function is called once per item, even if sized.
+    calls = []
+    def weigh(size):
+        calls.append(size)
+        return size
+    bar = SimpleProgressBar()
+    for size in bar(sizes, total=sum(sizes), weight=weigh):
+        time.sleep(size / 1e6)
+    assert len(calls) == n and bar.max_value == sum(sizes)
+    bar = SimpleProgressBar()
+    for size in bar(iter(sizes), total=sum(sizes), weight=lambda size: size):
+        time.sleep(size / 1e6)
+    assert bar._published_value == sum(sizes) - sizes[-1]
+    bar = SimpleProgressBar()
+    bar.max_value = sum(sizes)
+    with bar:
+        for size in sizes:
+            time.sleep(size / 1e6)
+            bar.advance(size)
+    return 4*sum(sizes)/1e6
+
+@test
+def test_reuse_with_reset(n):
+    bar = SimpleProgressBar()
+    for _ in range(2):
+        bar.reset()
+        bar.begin()
+        for i in range(n):
+            time.sleep(0.005)
+            bar.publish(100*(i+1)/n)
+        bar.end()
+    return n/100
+
 bar = SimpleProgressBar()
 @test
 @display_progress(bar)
@@ -119,6 +215,31 @@ def test_myextension(n):
     bar = ProgressIndicator(components=[Percentage(), MyExtension()])
     return extension_test_helper_determinate_type1(bar, n)
 
+@test
+def test_wide_characters(n):
+    assert get_width(u'\u8fdb\u5ea6') == 4
+    assert get_width(u'e\u0301') == 1
+    assert get_width(u'\u2764\ufe0f ok') == 4
+    if str is bytes:
+        # Python 2 str of UTF-8 encoded characters.
+        assert get_width(u'\u8fdb\u5ea6'.encode('utf-8')) == 4
+    bar = ProgressIndicator(components=[u'\u8fdb\u5ea6', Percentage(), Sparkline()])
+    rv = extension_test_helper_determinate_type1(bar, n)
+    assert bar._last_frame_width == 4 + 1 + 4 + 1 + 20
+    return rv
+
+@test
+def test_multi_tag_provider(n):
+    bar = ProgressIndicator(components=[Percentage(), MyMultiTagExtension(),
+                                        Rate(), ETA(), ETA1()])
+    bar.register_provider(MyMultiTagProvider())
+    # Replaces a single tag of the default rate, eta and eta1 provider.
+    bar.deregister_provider(TAG_ETA)
+    bar.register_provider(ETAProvider())
+    rv = extension_test_helper_determinate_type1(bar, n)
+    assert bar.get_stats()['calls_left'] == 0
+    return rv
+
 @test
 def test_extension_eta(n):
     bar = ProgressIndicator(components=[ETA()])
@@ -129,6 +250,21 @@ def test_extension_eta1(n):
     bar = ProgressIndicator(components=[ETA1()])
     return extension_test_helper_determinate_type2(bar, n)
 
+@test
+def test_extension_trend_eta(n):
+    etas = []
+    class ETATrendProbe(BaseExtension):
+        def __init__(self):
+            BaseExtension.__init__(self, requirements=[TAG_ETA_TREND])
+        def on_update(self, params):
+            etas.append(params[0])
+            self.set_value('')
+    bar = ProgressIndicator(components=[TrendETA(show_interval=True), ETATrendProbe()])
+    sleep_time = extension_test_helper_determinate_type2(bar, n)
+    # A trend is fitted from the third point on.
+    assert None not in etas[3:-1]
+    return sleep_time
+
 @test
 def test_extension_spinner(n):
     bar = ProgressIndicator(components=[Spinner()])
@@ -149,6 +285,29 @@ def test_extension_bar(n):
     bar = ProgressIndicator(components=[Bar()])
     return extension_test_helper_determinate_type1(bar, n)
 
+@test
+def test_memoize(n):
+    # Cached output is reused, and not once the configuration changes.
+    bar_extension = Bar(length=10)
+    size = Size()
+    bar = ProgressIndicator(components=[bar_extension, size], max_value=2000)
+    frames = []
+    for length, unit in ((10, 'B'), (20, 'B'), (20, 'items')):
+        bar_extension.length = length
+        size.unit = unit
+        bar.begin()
+        for i in range(n):
+            bar.publish(1000*(i+1)/n)
+            time.sleep(0.01)
+        bar.refresh()
+        frames.append(bar.get_last_frame())
+        bar.end()
+    assert bar_extension._get_bar(5) is bar_extension._get_bar(5)
+    assert frames == ['[#####     ] 1000 B',
+                      '[##########          ] 1000 B',
+                      '[##########          ] 1.00 kitems']
+    return 3*n/100
+
 @test
 def test_extension_bouncing_bar(n):
     bar = ProgressIndicator(components=[BouncingBar()])
@@ -159,11 +318,112 @@ def test_extension_rate(n):
     bar = ProgressIndicator(components=[Rate()])
     return extension_test_helper_indeterminate_type2(bar, n)
 
+@test
+def test_extension_sparkline(n):
+    sparkline = Sparkline(width=10)
+    bar = ProgressIndicator(components=[Rate(), sparkline])
+    rv = extension_test_helper_indeterminate_type2(bar, n)
+    assert len(sparkline.get_value()) == 10
+    assert sparkline._min == min(sparkline._rates[:sparkline._count])
+    return rv
+
 @test
 def test_extension_percentage(n):
     bar = ProgressIndicator(components=[Percentage()])
     return extension_test_helper_determinate_type1(bar, n)
 
+@test
+def test_update_policy(n):
+    bar = ProgressIndicator(components=[Percentage(), Bar()],
+                            update_policy=MaxFPS(5) | MinIterationDelta(n//4))
+    return extension_test_helper_determinate_type1(bar, n)
+
+@test
+def test_headless(n):
+    bar = SimpleProgressBar()
+    bar.allow_to_print(False)
+    bar.begin()
+    for i in range(n):
+        time.sleep(0.01)
+        bar.publish(100*(i+1)/n)
+    stats = bar.get_stats()
+    assert stats[TAG_ITERATIONS] == n and stats[TAG_PERCENTAGE] == 100
+    bar.end()
+    return n/100
+
+@test
+def test_headless_observed(n):
+    # Headless calls reach overrides of publish and recorders, and printing
+    # again updates extensions without beginning them again.
+    events = []
+    class EventExtension(BaseExtension):
+        def __init__(self):
+            BaseExtension.__init__(self, requirements=[TAG_ITERATIONS])
+        def on_begin(self, params):
+            events.append('begin')
+            self.set_value('')
+        def on_update(self, params):
+            events.append(params[0])
+    class CountingBar(ProgressIndicator):
+        calls = 0
+        def publish(self, value=None, worker=None):
+            CountingBar.calls += 1
+            ProgressIndicator.publish(self, value, worker)
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    os.remove(path)
+    try:
+        bar = CountingBar(components=[Percentage(), EventExtension()])
+        with Recorder(path) as recorder:
+            bar.recorder = recorder
+            bar.begin()
+            for i in range(n):
+                if i == n//4:
+                    bar.allow_to_print(False)
+                elif i == 3*n//4:
+                    bar.allow_to_print(True)
+                    assert events[-1] == i
+                bar.publish(100*(i+1)/n)
+                time.sleep(0.01)
+            bar.end()
+        assert CountingBar.calls == n
+        assert events.count('begin') == 1
+        assert sum(record[0] == 'publish' for record in read_records(path)) == n
+    finally:
+        os.remove(path)
+    return n/100
+
+@test
+def test_snapshot(n):
+    bar = ProgressIndicator(components=[Percentage(), Bar(), Latency()])
+    bar.history = History()
+    snapshots = []
+    copies = []
+    is_done = threading.Event()
+    def poll():
+        while not is_done.wait(0.02):
+            snapshot = bar.snapshot()
+            snapshots.append(snapshot)
+            copies.append(dict(snapshot))
+    poller = threading.Thread(target=poll)
+    poller.start()
+    bar.begin()
+    for i in range(n):
+        bar.publish(100*(i+1)/n)
+        time.sleep(0.01)
+    bar.end()
+    is_done.set()
+    poller.join()
+    assert all(snapshot.get(TAG_VALUE) in (None, snapshot[TAG_PERCENTAGE])
+               for snapshot in snapshots)
+    assert bar.snapshot()[TAG_PERCENTAGE] == 100
+    # Snapshots do not change once taken.
+    assert all(TAG_LATENCY not in snapshot and TAG_HISTORY not in snapshot
+               for snapshot in snapshots)
+    assert [dict(snapshot) for snapshot in snapshots] == copies
+    assert bar.get_stats()[TAG_LATENCY].count == n
+    return n/100
+
 @test
 def test_with_print(n):
     bar = SimpleProgressBar()
@@ -176,6 +436,484 @@ def test_with_print(n):
     bar.end()
     return n/100
 
+@test
+def test_log_handler(n):
+    bar = SimpleProgressBar()
+    logger = logging.getLogger('progressindicator.test')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ProgressLogHandler(bar, capacity=2)
+    logger.addHandler(handler)
+    try:
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+            if n/2<=i<=n/2+n/200:
+                logger.info("Processed %d", i)
+        logger.warning("Done")
+        bar.end()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    return n/100
+
+@test
+def test_log_handler_headless(n):
+    # Records are written as is while no Progress Bar is drawn.
+    lines = []
+    class Stream(object):
+        def write(self, text):
+            lines.append(text)
+        def flush(self):
+            pass
+    bar = SimpleProgressBar()
+    bar.stream = Stream()
+    bar.allow_to_print(False)
+    logger = logging.getLogger('progressindicator.test.headless')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ProgressLogHandler(bar)
+    logger.addHandler(handler)
+    try:
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+            if i % (n//4) == 0:
+                logger.info("Processed %d", i)
+        bar.end()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+    assert lines == ["Processed {}\n".format(i) for i in range(0, n, n//4)]
+    return n/100
+
+@test
+def test_extension_latency(n):
+    bar = ProgressIndicator(components=[Latency()])
+    return extension_test_helper_determinate_type2(bar, n)
+
+@test
+def test_extension_stragglers(n):
+    bar = ProgressIndicator(components=[Percentage(), Bar(length=40), Stragglers()])
+    lock = threading.Lock()
+    done = [0]
+    def work(delay):
+        for _ in range(n//4):
+            time.sleep(delay)
+            with lock:
+                done[0] += 1
+                bar.publish(100*done[0]/(n//4*4))
+    workers = [threading.Thread(target=work, args=(delay,), name='worker-{}'.format(i))
+               for i, delay in enumerate([0.01, 0.01, 0.01, 0.03])]
+    bar.begin()
+    for worker in workers:
+        worker.start()
+    # While all workers are running, the slowest one is reported first.
+    time.sleep(n/4*0.01/2)
+    with lock:
+        bar.refresh()
+        frame = bar.get_last_frame()
+    for worker in workers:
+        worker.join()
+    rates = bar.get_stats()[TAG_WORKER_RATE]
+    bar.end()
+    assert sorted(rates) == sorted(worker.ident for worker in workers)
+    assert 'slowest: worker-3 ' in frame
+    return n/4*0.03
+
+@test
+def test_legacy_on_publish(n):
+    # Providers overriding on_publish without the worker parameter.
+    class PublishCounter(BaseProvider):
+        def __init__(self):
+            BaseProvider.__init__(self, tag='publish_count', requirements=[])
+        def on_begin(self, params):
+            self.set_value(0)
+        def on_publish(self, time_, value):
+            self.set_value(self.get_value() + 1)
+        def on_update(self, params):
+            pass
+    class PublishCountExtension(BaseExtension):
+        def __init__(self):
+            BaseExtension.__init__(self, requirements=['publish_count'])
+        def on_update(self, params):
+            self.set_value(str(params[0]))
+    bar = ProgressIndicator(components=[Percentage(), PublishCountExtension()])
+    bar.register_provider(PublishCounter())
+    rv = extension_test_helper_determinate_type1(bar, n)
+    assert bar.get_stats()['publish_count'] == n
+    return rv
+
+@test
+def test_builtin_tag_override(n):
+    # Tags of the built-in providers other than rate, eta and eta1 are only
+    # taken once required, so custom providers can be registered for them.
+    class ConstantThroughput(BaseProvider):
+        def __init__(self):
+            BaseProvider.__init__(self, tag=TAG_THROUGHPUT, requirements=[])
+        def on_begin(self, params):
+            self.set_value(42)
+        def on_update(self, params):
+            pass
+    class ThroughputExtension(BaseExtension):
+        def __init__(self):
+            BaseExtension.__init__(self, requirements=[TAG_THROUGHPUT])
+        def on_update(self, params):
+            self.set_value(str(params[0]))
+    bar = ProgressIndicator(components=[Percentage(), ThroughputExtension()])
+    bar.register_provider(ConstantThroughput())
+    rv = extension_test_helper_determinate_type1(bar, n)
+    assert bar.get_stats()[TAG_THROUGHPUT] == 42
+    return rv
+
+@test
+def test_iter_chunks(n):
+    data = bytearray(1024 * n)
+    processed = 0
+    for chunk in iter_chunks(SimpleProgressBar(), data, 1024, unit='bytes'):
+        processed += len(chunk)
+        time.sleep(0.01)
+    assert processed == len(data)
+    return n/100
+
+@test
+def test_progress_server(n):
+    with ProgressServer(update_interval=0.05) as server:
+        reporters = [ProgressReporter(server.address) for _ in range(3)]
+        for i in range(n):
+            for task_id, reporter in enumerate(reporters):
+                reporter.report(task_id, min(n, (i+1)*(task_id+1)), n)
+            time.sleep(0.01)
+        for reporter in reporters:
+            reporter.close()
+        time.sleep(0.1)
+    # Complete tasks are written above the block and dropped.
+    assert not server.indicators and server._finished == set([0, 1, 2])
+    return n/100 + 0.1
+
+@test
+def test_frame_scheduler(n):
+    writes = []
+    class Stream(object):
+        def write(self, text):
+            writes.append(text)
+        def flush(self):
+            pass
+    max_fps = 20
+    start_time = time.time()
+    with FrameScheduler(stream=Stream(), max_fps=max_fps, budget=2) as scheduler:
+        bars = [ProgressIndicator(components=[Percentage(), BouncingBar(length=40)])
+                for _ in range(4)]
+        for bar in bars:
+            bar.clear_on_task_completion = False
+            scheduler.register(bar)
+            bar.begin()
+        for i in range(n):
+            for bar in bars:
+                bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+        for bar in bars:
+            bar.end()
+        # The final frames are written without waiting for close.
+        time.sleep(2.0 / max_fps)
+        write_count = len(writes)
+        assert writes[-1].count('100%') == 4
+    assert write_count <= (time.time() - start_time) * max_fps + 1
+    return n/100 + 2.0 / max_fps
+
+@test
+def test_default_scheduler(n):
+    writes = []
+    class Stream(object):
+        def write(self, text):
+            writes.append(text)
+        def flush(self):
+            pass
+    scheduler = FrameScheduler(stream=Stream(), max_fps=20)
+    set_default_scheduler(scheduler)
+    try:
+        for task in range(2):
+            bar = ProgressIndicator(components=["Task {}".format(task),
+                                                Percentage()])
+            bar.clear_on_task_completion = False
+            bar.begin()
+            assert bar.display is scheduler
+            for i in range(n):
+                bar.publish(100*(i+1)/n)
+                time.sleep(0.005)
+            bar.end()
+            assert bar.display is None and not scheduler.indicators
+    finally:
+        set_default_scheduler(None)
+    # The final frame of each task stays above the block.
+    output = ''.join(writes)
+    assert 'Task 0 100%' in output and 'Task 1 100%' in output
+    return 2*n*0.005
+
+@test
+def test_task_board(n):
+    registry = TaskRegistry()
+    tasks = [registry.add(n) for _ in range(1000)]
+    with TaskBoard(registry, k=5) as board:
+        for i in range(n):
+            for j, task in enumerate(tasks):
+                registry.advance(task, 1 if j % 7 else 0.5)
+            board.update()
+            time.sleep(0.01)
+    assert all(task % 7 == 0 for task in registry.top(5, 'slowest'))
+    registry.remove(tasks[0])
+    try:
+        registry.update(tasks[0], n)
+    except KeyError:
+        pass
+    else:
+        assert False, "A removed task was updated"
+    return n/100
+
+@test
+def test_status_server(n):
+    bar = SimpleProgressBar()
+    with StatusServer(cache_interval=0.05) as server:
+        url = 'http://{}:{}/status.json'.format(*server.address)
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+            if i % 25 == 0:
+                status = json.loads(urlopen(url).read().decode('utf-8'))
+                assert any(item['id'] == id(bar) for item in status)
+        bar.end()
+    return n/100
+
+@test
+def test_status_server_headless(n):
+    bar = SimpleProgressBar()
+    bar.allow_to_print(False)
+    with StatusServer(cache_interval=0.05) as server:
+        url = 'http://{}:{}/status'.format(*server.address)
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+        status = json.loads(urlopen(url + '.json').read().decode('utf-8'))
+        tags = [item['tags'] for item in status if item['id'] == id(bar)][0]
+        assert tags[TAG_PERCENTAGE] > 50 and tags[TAG_ITERATIONS] > n/2
+        text = urlopen(url + '.txt').read().decode('utf-8')
+        assert re.match(r'\d+% \d+ iterations\n', text)
+        bar.end()
+    return n/100
+
+@test
+def test_record_replay(n):
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    os.remove(path)
+    try:
+        bar = SimpleProgressBar()
+        with Recorder(path) as recorder:
+            bar.recorder = recorder
+            rv = extension_test_helper_determinate_type1(bar, n)
+        replay(path, SimpleProgressBar())
+        # Records straddling blocks are read whole, and a truncated trailing
+        # record is dropped.
+        records = list(read_records(path))
+        assert len(records) == n + 2 and records[-1][0] == 'end'
+        assert list(read_records(path, block_size=7)) == records
+        with open(path, 'ab') as file_:
+            file_.write(b'P\x00')
+        assert list(read_records(path, block_size=7)) == records
+    finally:
+        os.remove(path)
+    return rv
+
+@test
+def test_history(n):
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        bar = SimpleProgressBar()
+        bar.history = History(archives=((0.02, 10), (0.1, 5), (1, 5)),
+                              export_path=path)
+        rv = extension_test_helper_determinate_type1(bar, n)
+        for level, size in enumerate((10, 5, 5)):
+            points = bar.history.get_points(level)
+            assert 0 < len(points) <= size
+            assert points[-1][1] == 100
+        with open(path) as file_:
+            rows = file_.read().splitlines()
+        assert rows[0] == 'resolution,time,value,rate'
+        assert len(rows) == 1 + sum(len(bar.history.get_points(level))
+                                    for level in range(3))
+    finally:
+        os.remove(path)
+    return rv
+
+@test
+def test_history_headless(n):
+    # A headless indicator records as many points as a printing one.
+    counts = []
+    for is_allowed_to_print in (True, False):
+        bar = SimpleProgressBar()
+        bar.allow_to_print(is_allowed_to_print)
+        bar.history = History(archives=((0.005, 10*n),))
+        extension_test_helper_determinate_type1(bar, n)
+        counts.append(len(bar.history.get_points()))
+    assert counts[1] >= counts[0] * 0.9 and counts[1] > n/2
+    return 2*n/100
+
+@test
+def test_run_process(n):
+    script = ("import sys, time\n"
+              "for i in range({n}):\n"
+              "    for j in range(1000):\n"
+              "        sys.stderr.write('noise {{}}\\n'.format(j))\n"
+              "    sys.stderr.write('frame {{}}/{n}\\r'.format(i + 1))\n"
+              "    sys.stderr.flush()\n"
+              "    time.sleep(0.01)\n").format(n=n)
+    bar = SimpleProgressBar()
+    pattern = re.compile(br'frame (?P<value>\d+)/(?P<total>\d+)')
+    assert run_process(bar, [sys.executable, '-c', script], pattern=pattern) == 0
+    assert bar.max_value == n
+    assert 0 < bar.get_stats()[TAG_ITERATIONS] <= n
+    bar = SimpleProgressBar()
+    bar.max_value = n
+    parser = lambda line: int(line[6:].split('/')[0]) if line.startswith('frame') else None
+    assert run_process(bar, [sys.executable, '-c', script + "sys.exit(3)"],
+                       parser=parser) == 3
+    assert bar.get_last_frame().startswith('100%')
+    return 2*n/100
+
+@test
+def test_iter_copy(n):
+    data = os.urandom(1024 * n)
+    fd, path = tempfile.mkstemp()
+    os.write(fd, data)
+    fd_out, path_out = tempfile.mkstemp()
+    try:
+        # file to file, file to pipe and pipe to file
+        os.lseek(fd, 0, os.SEEK_SET)
+        assert sum(iter_copy(fd, fd_out, buffer_size=1000)) == len(data)
+        read_fd, write_fd = os.pipe()
+        os.lseek(fd, 0, os.SEEK_SET)
+        thread = threading.Thread(target=lambda: sum(iter_copy(fd, write_fd)) and os.close(write_fd))
+        thread.start()
+        assert sum(iter_copy(read_fd, fd_out, buffer_size=4096)) == len(data)
+        thread.join()
+        os.close(read_fd)
+        with open(path_out, 'rb') as file_:
+            assert file_.read() == data + data
+    finally:
+        os.close(fd)
+        os.close(fd_out)
+        os.remove(path)
+        os.remove(path_out)
+    bar = ProgressIndicator(components=[Size('items'), Throughput('items')])
+    rv = extension_test_helper_determinate_type1(bar, n)
+    assert 0 < bar.get_stats()[TAG_THROUGHPUT] < float('inf')
+    return rv
+
+@test
+def test_startup(n):
+    # Import and first frame of a new process, which CLIs pay on each run,
+    # followed by a short task.
+    script = ("import sys, time\n"
+              "start = time.time()\n"
+              "from progressindicator.core import AdvancedProgressBar\n"
+              "imported = time.time()\n"
+              "bar = AdvancedProgressBar()\n"
+              "bar.begin()\n"
+              "begun = time.time()\n"
+              "for i in range(10):\n"
+              "    time.sleep(0.01)\n"
+              "    bar.publish(10 * (i + 1))\n"
+              "bar.end()\n"
+              "heavy = ['subprocess', 'socket', 'logging', 'json', 'argparse']\n"
+              "sys.stdout.write(' '.join([repr(imported - start), repr(begun - imported)]\n"
+              "                          + [module for module in heavy if module in sys.modules]))\n")
+    runs = []
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(5):
+            output = subprocess.check_output([sys.executable, '-c', script],
+                                             stderr=devnull)
+            runs.append(output.decode().split())
+    fields = min(runs, key=lambda fields: float(fields[0]) + float(fields[1]))
+    import_time, begin_time = float(fields[0]), float(fields[1])
+    print("Import time = {:.1f}ms\nConstruct and begin time = {:.1f}ms".format(
+        import_time * 1e3, begin_time * 1e3))
+    assert fields[2:] == []
+    assert import_time < 0.1 and begin_time < 0.05
+    return 5 * 10 * 0.01
+
+@test
+def test_watchdog(n):
+    stalls = []
+    bar = ProgressIndicator(components=[Percentage(), Bar(), StallMarker()])
+    with Watchdog(bar, timeout=0.2, callbacks=[lambda bar, reason: stalls.append(reason)]):
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.5 if i == n//2 else 0.01)
+        bar.end()
+    assert len(stalls) == 1
+    return 0.01 * (n - 1) + 0.5
+
+@test
+def test_watchdog_clock(n):
+    # Stalls are measured with the clock of the indicator.
+    stalls = []
+    bar = ProgressIndicator(components=[Percentage(), StallMarker()])
+    bar.clock = VirtualClock()
+    with Watchdog(bar, timeout=1, check_interval=0.01,
+                  callbacks=[lambda bar, reason: stalls.append(reason)]):
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.01)
+        assert not stalls
+        bar.clock.time += 2
+        deadline = time.time() + 2
+        while not stalls and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(stalls) == 1 and 'STALLED' in bar.get_last_frame()
+        bar.end()
+    return n/100 + 0.1
+
+@test
+def test_watchdog_thread(n):
+    # Providers only run in the publishing thread, and a failing callback
+    # does not stop monitoring.
+    threads = set()
+    frames = []
+    class ThreadProvider(BaseProvider):
+        def __init__(self):
+            BaseProvider.__init__(self, tag='thread', requirements=[TAG_VALUE])
+        def on_update(self, params):
+            threads.add(threading.current_thread().name)
+    class ThreadExtension(BaseExtension):
+        def __init__(self):
+            BaseExtension.__init__(self, requirements=['thread'])
+        def on_begin(self, params):
+            self.set_value('')
+    def callback(bar, reason):
+        frames.append(bar.get_last_frame())
+        if len(frames) == 1:
+            raise RuntimeError("callback failed")
+    bar = ProgressIndicator(components=[Percentage(), ThreadExtension(), StallMarker()])
+    bar.register_provider(ThreadProvider())
+    with Watchdog(bar, timeout=0.2, callbacks=[callback]) as watchdog:
+        bar.begin()
+        for i in range(n):
+            bar.publish(100*(i+1)/n)
+            time.sleep(0.5 if i in (n//3, 2*n//3) else 0.01)
+        bar.end()
+        assert watchdog._thread.is_alive()
+    assert threads == set([threading.current_thread().name])
+    assert len(frames) == 2
+    assert all('STALLED' in frame for frame in frames)
+    return 0.01 * (n - 2) + 1.0
+
 def benchmark():
     stmts = ['[i for i in range(int(1e7))]',
     'from progressindicator.core import SimpleProgressBar; [i for i in SimpleProgressBar()(range(int(1e7)))]']
@@ -200,26 +938,89 @@ class MyExtension(BaseExtension):
    def on_end(self, params):
        self.set_value("Task is finished")
 
+class MyMultiTagProvider(BaseProvider):
+   def __init__(self):
+       BaseProvider.__init__(self, tag=('calls_per_percent', 'calls_left'),
+                             requirements=[TAG_ITERATIONS, TAG_PERCENTAGE])
+
+   def on_validated(self, params):
+       try:
+           calls_per_percent = params[0] / params[1]
+       except ZeroDivisionError:
+           self.set_value(None)
+       else:
+           self.set_value((calls_per_percent,
+                           calls_per_percent * (100 - params[1])))
+
+
+class MyMultiTagExtension(BaseExtension):
+   def __init__(self):
+       BaseExtension.__init__(self, requirements=['calls_per_percent',
+                                                  'calls_left'])
+
+   def on_validated(self, params):
+       self.set_value("{:.1f} calls/% {:.0f} left".format(*params))
+
+   def on_invalidated(self, params):
+       self.set_value('')
+
 def main():
     n = 100
     # Testing various use cases
     test_generator_wrapper(n)
     test_iterator_wrapper(n)
+    test_estimated_total(n)
+    test_dynamic_total(n)
+    test_weighted_iterator(n)
+    test_reuse_with_reset(n)
     test_decorator(n)
     test_context_manager(n)
     test_with_print(n)
+    test_log_handler(n)
+    test_log_handler_headless(n)
+    test_headless(n)
+    test_headless_observed(n)
+    test_snapshot(n)
+    test_update_policy(n)
 
     # Testing extensions
     test_extension_eta(n)
     test_extension_eta1(n)
+    test_extension_trend_eta(n)
     test_myextension(n)
+    test_wide_characters(n)
+    test_multi_tag_provider(n)
     test_extension_spinner(n)
     test_extension_loader(n)
     test_extension_timer(n)
     test_extension_bar(n)
+    test_memoize(n)
     test_extension_bouncing_bar(n)
     test_extension_rate(n)
+    test_extension_sparkline(n)
     test_extension_percentage(n)
+    test_extension_latency(n)
+    test_extension_stragglers(n)
+    test_legacy_on_publish(n)
+    test_builtin_tag_override(n)
+
+    # Testing utilities
+    test_iter_chunks(n)
+    test_record_replay(n)
+    test_history(n)
+    test_history_headless(n)
+    test_run_process(n)
+    test_iter_copy(n)
+    test_progress_server(n)
+    test_frame_scheduler(n)
+    test_default_scheduler(n)
+    test_task_board(n)
+    test_status_server(n)
+    test_status_server_headless(n)
+    test_watchdog(n)
+    test_watchdog_clock(n)
+    test_watchdog_thread(n)
+    test_startup(n)
     #benchmark()
 
 if __name__ == '__main__':